@@ -0,0 +1,20 @@
+# Compilation of the Cython implementation of the step kernels (tailorshop_core.pyx).
+# Running this script (requires Cython and a C compiler) creates the native extension 
+# module tailorshop_core next to this file. When it is present and the ahead-of-time 
+# compiled numba kernels (see build_kernel.py) are not, the simulation uses it instead 
+# of numba, so numba is not needed at all.
+from setuptools import setup, Extension
+from Cython.Build import cythonize
+import numpy as np
+import os
+
+if __name__ == "__main__":
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    # Floating point contraction (fused multiply-add) would change the results 
+    # compared to the numba kernels
+    compile_args = [] if os.name == "nt" else ["-O2", "-ffp-contract=off"]
+    extension = Extension("tailorshop_core", ["tailorshop_core.pyx"], 
+                          include_dirs=[np.get_include()],
+                          extra_compile_args=compile_args)
+    setup(name="tailorshop_core", ext_modules=cythonize([extension]),
+          script_args=["build_ext", "--inplace"])
@@ -0,0 +1,33 @@
+# Ahead-of-time compilation of the step kernels (single step, batch and trajectory).
+# Running this script creates the native extension module tailorshop_kernel next to 
+# this file. When it is present, the simulation uses it instead of compiling the 
+# kernels with numba at runtime, so there is no compilation stall on start.
+from numba.pycc import CC
+from tailorshop import _step_kernel, _step_batch_kernel, _trajectory_kernel, _KERNEL_LAYOUT_HASH
+import os
+
+cc = CC("tailorshop_kernel")
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+@cc.export("step_kernel", "f8[:](f8[:], f8[:], f8[:], f8, f8, f8, f8, f8[:])")
+def step_kernel(actions, last_actions, ts_state, rnd_machines_50, rnd_machines_100, 
+                rnd_customer_interest, rnd_material_price, params):
+    return _step_kernel(actions, last_actions, ts_state, rnd_machines_50, rnd_machines_100,
+                        rnd_customer_interest, rnd_material_price, params)
+
+@cc.export("step_batch_kernel", "f8[:,:](f8[:,:], f8[:,:], f8[:,:], f8[:,:], f8[:])")
+def step_batch_kernel(actions, last_actions, ts_states, rnd, params):
+    return _step_batch_kernel(actions, last_actions, ts_states, rnd, params)
+
+@cc.export("trajectory_kernel", "f8[:,:](f8[:,:], f8[:], f8[:], f8[:,:], f8[:])")
+def trajectory_kernel(action_seq, last_actions, ts_state, rnd, params):
+    return _trajectory_kernel(action_seq, last_actions, ts_state, rnd, params)
+
+# Checked by tailorshop.py on import, so that the module is ignored 
+# when the positions of the variables have changed since it was built
+@cc.export("kernel_layout_hash", "i8()")
+def kernel_layout_hash():
+    return _KERNEL_LAYOUT_HASH
+
+if __name__ == "__main__":
+    cc.compile()
@@ -1,4 +1,5 @@
 from tailorshop import Tailorshop
+import numpy as np
 if __name__ == "__main__":
     # Create Tailorshop instance
     ts = Tailorshop(use_steps=True)
@@ -7,6 +8,9 @@ if __name__ == "__main__":
     # Obtain initial actions
     actions = ts.get_last_actions()
 
+    # Record the applied actions (one row per step)
+    applied_actions = []
+
     # Hire 2 workers and machines (100), increase material order to 500
     actions.set_workers100(2)
     actions.set_machines100(2)
@@ -14,6 +18,7 @@ if __name__ == "__main__":
 
     # Do step
     ts.do_next_step(actions)
+    applied_actions.append(actions.to_array())
     print(ts)
 
     # Change locations
@@ -21,6 +26,7 @@ if __name__ == "__main__":
 
     # Do step
     ts.do_next_step(actions)
+    applied_actions.append(actions.to_array())
     print(ts)
 
     # Change advertising and worker salary/benefits
@@ -30,6 +36,7 @@ if __name__ == "__main__":
 
     # Do step
     ts.do_next_step(actions)
+    applied_actions.append(actions.to_array())
     print(ts)
 
     # Change shirt price
@@ -37,4 +44,10 @@ if __name__ == "__main__":
 
     # Do step
     ts.do_next_step(actions)
+    applied_actions.append(actions.to_array())
+    print(ts)
+
+    # Reset and replay all recorded steps in a single call
+    ts.reset()
+    ts.do_next_steps(np.array(applied_actions))
     print(ts)
@@ -1,169 +1,185 @@
-from tkinter import Label, LabelFrame, StringVar, Button, Tk
-from functools import partial
-from typing import Callable
+from tkinter import StringVar, Tk
+from tkinter.ttk import Label, LabelFrame, Button, Style
+from typing import Callable, Optional
 from tailorshop import Tailorshop
 from ts_types import Controllable_Variables
+from ts_types import (
+    STATE_BANK_ACCOUNT, STATE_COMPANY_VALUE, STATE_SHIRT_SALES, STATE_SHIRT_STOCK, 
+    STATE_MATERIAL_PRICE, STATE_MATERIAL_STOCK, STATE_CUSTOMER_INTEREST, STATE_PRODUCTION_IDLE
+)
 
 action_variables : dict[str,StringVar] = {}
 state_variables : dict[str,StringVar] = {}
 
-""" Changes the number of workers (w50) and updates the shown variable. 
+# Names of the locations (indexed by the numeric value of the location)
+location_names : tuple[str, ...] = ("Suburb", "City", "Inner City")
+
+# Stats shown in the GUI (in order of the rows): 
+# (label, key of the StringVar, attribute of the state, position in the state array)
+# Damage and worker satisfaction (%) are derived values, which are not stored 
+# in the state array (position None).
+observation_specs : tuple[tuple[str,str,str,Optional[int]], ...] = (
+    ("Bank Account:", "bank_account", "bank_account", STATE_BANK_ACCOUNT),
+    ("Company Value:", "company_value", "company_value", STATE_COMPANY_VALUE),
+    ("Shirt Sales:", "shirt_sales", "shirt_sales", STATE_SHIRT_SALES),
+    ("Shirt Stock:", "shirt_stock", "shirt_stock", STATE_SHIRT_STOCK),
+    ("Material Price:", "material_price", "material_price", STATE_MATERIAL_PRICE),
+    ("Material Stock:", "material_stock", "material_stock", STATE_MATERIAL_STOCK),
+    ("Customer Interest:", "customer_interest", "customer_interest", STATE_CUSTOMER_INTEREST),
+    ("Production Idle:", "production_idle", "production_idle", STATE_PRODUCTION_IDLE),
+    ("Machine Damage:", "damage", "damage", None),
+    ("Worker Satisfaction:", "worker_satisfaction", "percent_worker_satisfaction", None)
+)
+
+# Action variables waiting for an update of the shown value:
+# key of the StringVar -> (attribute of the actions, formatter)
+pending_action_updates : dict[str,tuple[str,Callable]] = {}
+
+# Last text written to each of the state variables
+last_shown_values : dict[str,str] = {}
+
+""" Updates a StringVar of the stats segments, but only if the
+    text differs from the one currently shown (each set triggers Tk updates).
 
     Parameters
     ----------
 
-    inc : int
-        Sign of the increment (1 for increment, -1 for decrement, 0 for update only).
-
-    """
-def change_w50(inc : int) -> None:
-    actions.set_workers50(actions.workers50 + inc)
-    action_variables["workers50"].set(str(actions.workers50))
-
-""" Changes the number of workers (w100) and updates the shown variable. 
-
-    Parameters
-    ----------
-
-    inc : int
-        Sign of the increment (1 for increment, -1 for decrement, 0 for update only).
-
-    """
-def change_w100(inc : int) -> None:
-    actions.set_workers100(actions.workers100 + inc)
-    action_variables["workers100"].set(str(actions.workers100))
-
-""" Changes the number of machines (m50) and updates the shown variable. 
-
-    Parameters
-    ----------
-
-    inc : int
-        Sign of the increment (1 for increment, -1 for decrement, 0 for update only).
-
-    """
-def change_m50(inc : int) -> None:
-    actions.set_machines50(actions.machines50 + inc)
-    action_variables["machines50"].set(str(actions.machines50))
-
-""" Changes the number of machines (m100) and updates the shown variable. 
-
-    Parameters
-    ----------
+    key : str
+        Key of the StringVar in state_variables.
 
-    inc : int
-        Sign of the increment (1 for increment, -1 for decrement, 0 for update only).
+    text : str
+        Text to show.
 
     """
-def change_m100(inc : int) -> None:
-    actions.set_machines100(actions.machines100 + inc)
-    action_variables["machines100"].set(str(actions.machines100))
+def set_state_variable(key : str, text : str) -> None:
+    if last_shown_values.get(key) != text:
+        state_variables[key].set(text)
+        last_shown_values[key] = text
 
-""" Changes the worker salary and updates the shown variable. 
+""" Formats a value rounded to an integer (rounding half to even, as round does).
+    Uses a single format call instead of creating an intermediate int.
 
     Parameters
     ----------
 
-    inc : int
-        Sign of the increment (1 for increment, -1 for decrement, 0 for update only).
-
-    """
-def change_w_sal(inc : int) -> None:
-    actions.set_workers_salary(actions.workers_salary + inc * 100)
-    action_variables["workers_salary"].set(str(actions.workers_salary))
-
-""" Changes the worker benefits and updates the shown variable. 
-
-    Parameters
-    ----------
+    value : float
+        Value to format.
 
-    inc : int
-        Sign of the increment (1 for increment, -1 for decrement, 0 for update only).
+    Returns
+    -------
+    str
+        The rounded value as text.
 
     """
-def change_w_ben(inc : int) -> None:
-    actions.set_worker_benefits(actions.worker_benefits + inc * 10)
-    action_variables["workers_benefits"].set(str(actions.worker_benefits))
+def format_rounded(value : float) -> str:
+    text = format(value, ".0f")
+    # Small negative values are formatted as "-0" (but round them to 0)
+    return "0" if text == "-0" else text
 
-""" Changes the shirt price and updates the shown variable. 
+""" Creates the callbacks for the plus/minus buttons of one of the 
+    controllable variables, which change the variable and update the shown value.
 
     Parameters
     ----------
 
-    inc : int
-        Sign of the increment (1 for increment, -1 for decrement, 0 for update only).
+    attribute : str
+        Name of the attribute of the actions (the setter is set_<attribute>).
 
-    """
-def change_shirt_price(inc : int) -> None:
-    actions.set_shirt_price(actions.shirt_price + inc * 2)
-    action_variables["shirt_price"].set(str(actions.shirt_price))
+    key : str
+        Key for retrieving the respective StringVar for updating values.
 
-""" Changes the number of outlets and updates the shown variable. 
+    step : int
+        Stepsize of the variable.
 
-    Parameters
-    ----------
+    formatter : Callable
+        Function converting the value into the shown text.
 
-    inc : int
-        Sign of the increment (1 for increment, -1 for decrement, 0 for update only).
+    Returns
+    -------
+    tuple[Callable, Callable]
+        Callbacks for incrementing and decrementing the variable.
 
     """
-def change_outlets(inc : int) -> None:
-    actions.set_outlets(actions.outlets + inc)
-    action_variables["outlets"].set(str(actions.outlets))
-
-""" Changes the material order and updates the shown variable. 
+def make_changer(attribute : str, key : str, step : int, 
+                 formatter : Callable = str) -> tuple[Callable, Callable]:
+    setter_name = "set_" + attribute
+    def make_callback(inc : int) -> Callable:
+        def change() -> None:
+            getattr(actions, setter_name)(getattr(actions, attribute) + inc * step)
+            schedule_action_update(key, attribute, formatter)
+        return change
+    return make_callback(1), make_callback(-1)
+
+""" Marks a shown action variable as outdated. The StringVars are not updated
+    immediately, but once Tk is idle, so that bursts of clicks (e.g., when holding 
+    a button) only cause a single update per variable.
 
     Parameters
     ----------
 
-    inc : int
-        Sign of the increment (1 for increment, -1 for decrement, 0 for update only).
-
-    """
-def change_material_order(inc : int) -> None:
-    actions.set_material_order(actions.material_order + inc * 50)
-    action_variables["material_order"].set(str(actions.material_order))
-
-""" Changes the spending for maintenance and updates the shown variable. 
+    key : str
+        Key for retrieving the respective StringVar for updating values.
 
-    Parameters
-    ----------
+    attribute : str
+        Name of the attribute of the actions to show.
 
-    inc : int
-        Sign of the increment (1 for increment, -1 for decrement, 0 for update only).
+    formatter : Callable
+        Function converting the value into the shown text.
 
     """
-def change_maintenance(inc : int) -> None:
-    actions.set_machines_maintenance(actions.machines_maintenance + inc * 100)
-    action_variables["maintenance"].set(str(actions.machines_maintenance))
-
-""" Changes the money spent on advertising and updates the shown variable. 
-
-    Parameters
-    ----------
+def schedule_action_update(key : str, attribute : str, formatter : Callable) -> None:
+    if not pending_action_updates:
+        window.after_idle(flush_action_updates)
+    pending_action_updates[key] = (attribute, formatter)
 
-    inc : int
-        Sign of the increment (1 for increment, -1 for decrement, 0 for update only).
+""" Writes the values of all outdated action variables into their StringVars.
 
     """
-def change_advertising(inc : int) -> None:
-    actions.set_advertising(actions.advertising + inc * 100)
-    action_variables["advertising"].set(str(actions.advertising))
+def flush_action_updates() -> None:
+    for key, (attribute, formatter) in pending_action_updates.items():
+        action_variables[key].set(formatter(getattr(actions, attribute)))
+    pending_action_updates.clear()
 
-""" Changes the location and updates the shown variable. 
-    In this case, the numeric value is used to find the correct string:
+""" Returns the name of a location. 
     0: Suburb, 1: City, 2: Inner City
 
     Parameters
     ----------
 
-    inc : int
-        Sign of the increment (1 for increment, -1 for decrement, 0 for update only).
+    location : int
+        Numeric value of the location.
+
+    Returns
+    -------
+    str
+        Name of the location.
 
     """
-def change_location(inc : int) -> None:
-    actions.set_location(actions.location + inc)
-    action_variables["location"].set(["Suburb", "City", "Inner City"][actions.location])
+def location_name(location : int) -> str:
+    return location_names[location]
+
+# Actions shown in the GUI (in order of the rows): 
+# (label, key of the StringVar, attribute of the actions, stepsize, formatter)
+action_specs : tuple[tuple[str,str,str,int,Callable], ...] = (
+    ("Workers (50):", "workers50", "workers50", 1, str),
+    ("Workers (100):", "workers100", "workers100", 1, str),
+    ("Worker Salary:", "workers_salary", "workers_salary", 100, str),
+    ("Worker Benefits:", "workers_benefits", "worker_benefits", 10, str),
+    ("Machines (50):", "machines50", "machines50", 1, str),
+    ("Machines (100):", "machines100", "machines100", 1, str),
+    ("Machines Maintenance:", "maintenance", "machines_maintenance", 100, str),
+    ("Material Order:", "material_order", "material_order", 50, str),
+    ("Outlet Stores:", "outlets", "outlets", 1, str),
+    ("Store Locations:", "location", "location", 1, location_name),
+    ("Shirt Price:", "shirt_price", "shirt_price", 2, str),
+    ("Advertising:", "advertising", "advertising", 100, str)
+)
+
+# Increment/decrement callbacks for the controllable variables, by key of the StringVar
+changers : dict[str,tuple[Callable,Callable]] = {
+    key: make_changer(attribute, key, step, formatter=formatter)
+    for _, key, attribute, step, formatter in action_specs
+}
 
 """ Helper function to add widgets to the action frame.
 
@@ -182,21 +198,25 @@ def change_location(inc : int) -> None:
     init_val : {int, str}
         Initial value to show.
     
-    command  : Callable
-        Callback for the plus/minus buttons.
+    increase : Callable
+        Callback for the plus button.
+
+    decrease : Callable
+        Callback for the minus button.
     
     row : int
         Row to place the widgets.
 
     """
 def add_action_widgets(action_frame : LabelFrame, text : str, key : str, 
-                       init_val : {int, str}, command : Callable, row : int) -> None:
+                       init_val : {int, str}, increase : Callable, 
+                       decrease : Callable, row : int) -> None:
     action_variables[key] = StringVar()
     action_variables[key].set(init_val)
     label = Label(action_frame, text=text)
-    value = Label(action_frame, textvariable=action_variables[key], width=10)
-    plus_btn = Button(action_frame, text="+", command=partial(command, 1), width=5)
-    minus_btn = Button(action_frame, text="-", command=partial(command, -1), width=5)
+    value = Label(action_frame, textvariable=action_variables[key], style="Value.TLabel")
+    plus_btn = Button(action_frame, text="+", command=increase, style="Change.TButton")
+    minus_btn = Button(action_frame, text="-", command=decrease, style="Change.TButton")
     
     label.grid(row=row, column=0, sticky="w")
     value.grid(row=row, column=1, sticky="w")
@@ -213,36 +233,9 @@ def add_action_widgets(action_frame : LabelFrame, text : str, key : str,
 
     """
 def create_action_frame(action_frame : LabelFrame) -> None:
-    add_action_widgets(action_frame, "Workers (50):", "workers50", 
-                       actions.workers50, change_w50, 0)
-    add_action_widgets(action_frame, "Workers (100):", "workers100", 
-                       actions.workers100, change_w100, 1)
-
-    add_action_widgets(action_frame, "Worker Salary:", "workers_salary", 
-                       actions.workers_salary, change_w_sal, 2)
-    add_action_widgets(action_frame, "Worker Benefits:", "workers_benefits", 
-                       actions.worker_benefits, change_w_ben, 3)
-    
-    add_action_widgets(action_frame, "Machines (50):", "machines50", 
-                       actions.machines50, change_m50, 4)
-    add_action_widgets(action_frame, "Machines (100):", "machines100", 
-                       actions.machines100, change_m100, 5)
-    add_action_widgets(action_frame, "Machines Maintenance:", "maintenance", 
-                       actions.machines_maintenance, change_maintenance, 6)
-
-    add_action_widgets(action_frame, "Material Order:", "material_order", 
-                       actions.material_order, change_material_order, 7)
-
-    add_action_widgets(action_frame, "Outlet Stores:", "outlets", 
-                       actions.outlets, change_outlets, 8)
-    add_action_widgets(action_frame, "Store Locations:", "location", 
-                       actions.location, change_location, 9)
-    change_location(0) # Used to convert the numeric into a text in the GUI
-
-    add_action_widgets(action_frame, "Shirt Price:", "shirt_price", 
-                       actions.shirt_price, change_shirt_price, 10)
-    add_action_widgets(action_frame, "Advertising:", "advertising", 
-                       actions.advertising, change_advertising, 11)
+    for row, (text, key, attribute, _, formatter) in enumerate(action_specs):
+        add_action_widgets(action_frame, text, key, 
+                           formatter(getattr(actions, attribute)), *changers[key], row)
 
     action_frame.grid_columnconfigure(0, weight=10)
     action_frame.grid_columnconfigure(1, weight=3)
@@ -274,9 +267,9 @@ def add_observation_var_widget(observation_frame : LabelFrame,
                                text : str, key : str, 
                                value : float, row : int) -> None:
     state_variables[key] = StringVar()
-    state_variables[key].set(str(round(value)))
+    set_state_variable(key, format_rounded(value))
     label = Label(observation_frame, text=text)
-    value = Label(observation_frame, textvariable=state_variables[key], width=10)
+    value = Label(observation_frame, textvariable=state_variables[key], style="Value.TLabel")
     label.grid(row=row, column=0, sticky="w")
     value.grid(row=row, column=1, sticky="w")
 
@@ -290,26 +283,10 @@ def add_observation_var_widget(observation_frame : LabelFrame,
 
     """
 def create_observation_frame(observation_frame : LabelFrame) -> None:
-    add_observation_var_widget(observation_frame, "Bank Account:", "bank_account", 
-                               tailorshop.current_state.bank_account, 0)
-    add_observation_var_widget(observation_frame, "Company Value:", "company_value", 
-                               tailorshop.current_state.company_value, 1)
-    add_observation_var_widget(observation_frame, "Shirt Sales:", "shirt_sales", 
-                               tailorshop.current_state.shirt_sales, 2)
-    add_observation_var_widget(observation_frame, "Shirt Stock:", "shirt_stock", 
-                               tailorshop.current_state.shirt_stock, 3)
-    add_observation_var_widget(observation_frame, "Material Price:", "material_price", 
-                               tailorshop.current_state.material_price, 4)
-    add_observation_var_widget(observation_frame, "Material Stock:", "material_stock", 
-                               tailorshop.current_state.material_stock, 5)
-    add_observation_var_widget(observation_frame, "Customer Interest:", "customer_interest", 
-                               tailorshop.current_state.customer_interest, 6)
-    add_observation_var_widget(observation_frame, "Production Idle:", "production_idle", 
-                               tailorshop.current_state.production_idle, 7)
-    add_observation_var_widget(observation_frame, "Machine Damage:", "damage", 
-                               tailorshop.current_state.damage, 8)
-    add_observation_var_widget(observation_frame, "Worker Satisfaction:", "worker_satisfaction", 
-                               tailorshop.current_state.percent_worker_satisfaction, 9)
+    ts_state = tailorshop.current_state
+    for row, (text, key, attribute, _) in enumerate(observation_specs):
+        add_observation_var_widget(observation_frame, text, key, 
+                                   getattr(ts_state, attribute), row)
 
     observation_frame.grid_columnconfigure(0, weight=8)
     observation_frame.grid_columnconfigure(1, weight=3)
@@ -317,32 +294,17 @@ def create_observation_frame(observation_frame : LabelFrame) -> None:
 """ Updates the stats segments of the GUI.
     """
 def update_information() -> None:
-    state_variables["turn"].set(
-        "Turn: {}".format(round(tailorshop.current_state.turn)))
-    state_variables["bank_account"].set(
-        str(round(tailorshop.current_state.bank_account)))
-    state_variables["company_value"].set(
-        str(round(tailorshop.current_state.company_value)))
-    state_variables["shirt_sales"].set(
-        str(round(tailorshop.current_state.shirt_sales)))
-    state_variables["shirt_stock"].set(
-        str(round(tailorshop.current_state.shirt_stock)))
-    state_variables["material_price"].set(
-        str(round(tailorshop.current_state.material_price)))
-    state_variables["material_stock"].set(
-        str(round(tailorshop.current_state.material_stock)))
-    state_variables["customer_interest"].set(
-        str(round(tailorshop.current_state.customer_interest)))
-    state_variables["production_idle"].set(
-        str(round(tailorshop.current_state.production_idle)))
-    state_variables["damage"].set(
-        str(round(tailorshop.current_state.damage)))
-    state_variables["worker_satisfaction"].set(
-        str(round(tailorshop.current_state.percent_worker_satisfaction)))
-    if tailorshop.is_finished():
-        state_variables["finished"].set("Finished!")
-    else:
-        state_variables["finished"].set("")
+    ts_state = tailorshop.current_state
+
+    # Read all stats stored in the state array at once
+    values = ts_state.to_array().tolist()
+    set_state_variable("turn", "Turn: {}".format(round(ts_state.turn)))
+    for _, key, attribute, index in observation_specs:
+        if index is None:
+            set_state_variable(key, format_rounded(getattr(ts_state, attribute)))
+        else:
+            set_state_variable(key, format_rounded(values[index]))
+    set_state_variable("finished", "Finished!" if tailorshop.is_finished() else "")
 
 """ Resets the simulation and updates the GUI.
 
@@ -352,20 +314,10 @@ def reset_simulation() -> None:
     global actions
     actions = tailorshop.get_last_actions()
 
-    # Since each variable in the GUI is updated when changed,
-    # we use this to update the GUI when resetting.
-    change_w50(0)
-    change_w100(0)
-    change_w_sal(0)
-    change_w_ben(0)
-    change_m100(0)
-    change_m50(0)
-    change_maintenance(0)
-    change_material_order(0)
-    change_outlets(0)
-    change_location(0)
-    change_advertising(0)
-    change_shirt_price(0)
+    # The freshly obtained actions are already valid, 
+    # so the shown values can be set directly without the setters.
+    for _, key, attribute, _, formatter in action_specs:
+        action_variables[key].set(formatter(getattr(actions, attribute)))
 
     # Update the stats segements
     update_information()
@@ -388,28 +340,38 @@ def next_step() -> None:
     """
 def create_simulation_bar(simulation_footer : LabelFrame) -> None:
     state_variables["turn"] = StringVar()
-    state_variables["turn"].set(
-        "Turn: {}".format(round(tailorshop.current_state.turn)))
+    set_state_variable("turn", 
+                       "Turn: {}".format(round(tailorshop.current_state.turn)))
     status_label = Label(simulation_footer, 
                          textvariable=state_variables["turn"], 
-                         width=10)
+                         style="Value.TLabel")
     status_label.grid(row=0, column=0)
 
     state_variables["finished"] = StringVar()
     finished_label = Label(simulation_footer, 
                            textvariable=state_variables["finished"], 
-                           width=10)
+                           style="Value.TLabel")
     finished_label.grid(row=0, column=1)
 
-    next = Button(simulation_footer, text="Next Step", command=next_step, width=15)
+    next = Button(simulation_footer, text="Next Step", command=next_step, style="Simulation.TButton")
     next.grid(row=1, column=0)
 
-    reset = Button(simulation_footer, text="Reset", command=reset_simulation, width=15)
+    reset = Button(simulation_footer, text="Reset", command=reset_simulation, style="Simulation.TButton")
     reset.grid(row=1, column=1)
 
     simulation_footer.grid_rowconfigure(0, weight=2)
     simulation_footer.grid_rowconfigure(1, weight=1)
 
+""" Creates the shared (themed) widget styles.
+    Must be called after the main window was created.
+
+    """
+def create_styles() -> None:
+    style = Style()
+    style.configure("Value.TLabel", width=10)
+    style.configure("Change.TButton", width=5)
+    style.configure("Simulation.TButton", width=15)
+
 if __name__ == "__main__":
     # Instantiate tailorshop simulation
     tailorshop : Tailorshop = Tailorshop()
@@ -419,6 +381,7 @@ if __name__ == "__main__":
     window = Tk()
     window.title("Tailorshop")
     window.geometry('500x450')
+    create_styles()
 
     # Create label frames for the sections
     action_frame = LabelFrame(window, text="Actions")
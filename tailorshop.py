@@ -1,286 +1,796 @@
 from __future__ import annotations
-from ts_types import Tailorshop_State, Controllable_Variables
+from ts_types import Tailorshop_State, Tailorshop_StateBatch, Controllable_Variables
+from ts_types import (
+    STATE_FIELDS, STATE_BANK_ACCOUNT, STATE_SHIRT_SALES, STATE_MATERIAL_PRICE, 
+    STATE_SHIRT_STOCK, STATE_WORKER_SATISFACTION, STATE_PRODUCTION_IDLE, 
+    STATE_COMPANY_VALUE, STATE_CUSTOMER_INTEREST, STATE_MATERIAL_STOCK, 
+    STATE_MACHINE_CAPACITY, STATE_TURN,
+    ACTION_FIELDS, ACTION_WORKERS50, ACTION_WORKERS100, ACTION_WORKERS_SALARY, 
+    ACTION_WORKER_BENEFITS, ACTION_SHIRT_PRICE, ACTION_OUTLETS, ACTION_LOCATION, 
+    ACTION_MATERIAL_ORDER, ACTION_MACHINES50, ACTION_MACHINES100, 
+    ACTION_MACHINES_MAINTENANCE, ACTION_ADVERTISING
+)
 import numpy as np
+import math
+import zlib
 from copy import copy
+from collections import OrderedDict
+
+try:
+    from numba import njit, prange
+except ImportError:
+    # Numba is optional: without it, the kernels below run as plain python functions
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+    prange = range
+
+# Default values of the simulation parameters (see the class attributes of Tailorshop)
+POSITIVE_INTEREST = 0.0025
+NEGATIVE_INTEREST = 0.0066
+MAX_MACHINE_CAPACITY = 50
+MAX_ADVERTISING_EFFECT = 900
+MAX_WORKER_SATISFACTION = 1.7
+LOCATIONS_RENTS = (500, 1000, 2000)
+OUTLET_RENT = 500
+CASH_INJECTION = 0
+PRICE_MACHINE50 = 10000
+PRICE_MACHINE100 = 20000
+PRICE_OUTLET = 10000
+
+# Positions of the simulation parameters in the array passed to the step kernel
+# (see Tailorshop._parameters_array)
+PARAM_POSITIVE_INTEREST = 0
+PARAM_NEGATIVE_INTEREST = 1
+PARAM_MAX_MACHINE_CAPACITY = 2
+PARAM_MAX_ADVERTISING_EFFECT = 3
+PARAM_RENT_SUBURB = 4
+PARAM_RENT_CITY = 5
+PARAM_RENT_INNER_CITY = 6
+PARAM_OUTLET_RENT = 7
+PARAM_PRICE_MACHINE50 = 8
+PARAM_PRICE_MACHINE100 = 9
+PARAM_PRICE_OUTLET = 10
+NUM_PARAMS = 11
+
+# Rows of the random variables of a simulation (see Tailorshop._rnd),
+# the columns correspond to the turns
+RND_MACHINES_50 = 0
+RND_MACHINES_100 = 1
+RND_CUSTOMER_INTEREST = 2
+RND_MATERIAL_PRICE = 3
+
+""" Calculates the total production capacity of the 50-shirts-producing
+    and 100-shirts-producing machines.
 
-class Tailorshop:
-    """ Main class for the Tailorshop simulation. 
-    Instantiates the simulation and allows to update it with given actions.
+    Parameters
+    ----------
+
+    actions: np.ndarray
+        The current actions/state of the controllable variables (see ACTION_FIELDS).
+
+    ts_state : np.ndarray
+        The state of the non-controllable tailorshop variables (see STATE_FIELDS).
+
+    rnd_machines_50 : float
+        The random fluctuation of the machine-50 capacity for the current turn.
+
+    rnd_machines_100 : float
+        The random fluctuation of the machine-100 capacity for the current turn.
+
+    Returns
+    -------
+    float
+        Capacity of all machines.
 
     """
-    positive_interest = 0.0025
-    negative_interest = 0.0066
-    max_machine_capacity = 50
-    max_advertising_effect = 900
-    max_worker_satisfaction = 1.7
-    locations_rents = [500, 1000, 2000]
-    outlet_rent = 500
-    cash_injection = 0
-    price_machine50 = 10000
-    price_machine100 = 20000
-    price_outlet = 10000
+@njit(cache=True)
+def _production_capacity(actions : np.ndarray, ts_state : np.ndarray, 
+                         rnd_machines_50 : float, rnd_machines_100 : float) -> float:
+    # Computed once for both kinds of machines. math.sqrt gives the same (correctly rounded)
+    # result as np.sqrt, but avoids the ufunc dispatch on scalars
+    satisfaction_effect = math.sqrt(abs(ts_state[STATE_WORKER_SATISFACTION]))
+
+    capacity_m50 = ts_state[STATE_MACHINE_CAPACITY] + rnd_machines_50
+    workers_m50 = min(actions[ACTION_MACHINES50], actions[ACTION_WORKERS50])
+    
+    capacity_m100 = (2 * ts_state[STATE_MACHINE_CAPACITY]) + rnd_machines_100
+    workers_m100 = min(actions[ACTION_MACHINES100], actions[ACTION_WORKERS100])
 
-    """ Instantiates the Tailorshop simulation.
+    return workers_m50 * capacity_m50 * satisfaction_effect \
+        + workers_m100 * capacity_m100 * satisfaction_effect
+
+""" Calculates the demand for shirts.
 
     Parameters
     ----------
-    ts_state : Tailorshop_State
-        The initial state or None. 
-        When no state is given, default initialization values are used.
 
-    initial_actions : Controllable_Variables
-        The initial state of the controllable variables or None. 
-        When no actions are given, default values are used.
-    
-    randomize : bool
-        When set to true, the dynamic effects parameters are generated randomly.
-        Otherwise, a fixed initialization is used.
-    
-    use_steps : bool
-        If true, the controllable variables can only be changed using the default stepsize,
-        and values not aligning with the stepsizes will be altered automatically.
-        Otherwise, all values within min/max limits are allowed.
+    actions: np.ndarray
+        The current actions/state of the controllable variables (see ACTION_FIELDS).
+
+    ts_state : np.ndarray
+        The state of the non-controllable tailorshop variables (see STATE_FIELDS).
+
+    Returns
+    -------
+    float
+        Demand for shirts.
 
     """
-    def __init__(self, ts_state : Tailorshop_State = None, 
-                 initial_actions : Controllable_Variables = None, 
-                 randomize : bool = False, use_steps : bool = True) -> None:
-        # Initialize random variables
-        self.rnd_machines_50 = [
-            -1.6794734, 0.3962952, -1.2906776, -1.69717836, 
-            0.6770368, 0.3517432, -1.5712524, 1.154388, 
-            -0.5179668, 1.634584, -1.3330284, -0.9713408, 
-            0.1261412, 0.8854424
-        ]
-        self.rnd_machines_100 = [
-            -0.8060082, 1.3505922, -1.7557848, -2.44459788, 
-            -1.0919448, -2.66181528, 0.2626608, -2.0520366, 
-            1.4789304, -1.7724894, -1.1784876, 1.6133514, 
-            0.6488046, 1.135758]
-        self.rnd_customer_interest = [
-            -23.04985, 19.2422, 34.44874, 19.7927,
-            -24.671, 30.50709, -4.26652, 38.93418, 
-            -12.88273, -47.064686, -13.75205, -49.315691, 
-            25.20559, 30.6675
-        ]
-        self.rnd_material_price = [
-            8.2671817, 4.8714296, 4.8530515, 5.9098319,
-            5.18731075, 7.09909075, 6.772157, 7.6171843, 
-            8.02385095, 2.6811532, 5.0227145, 6.29710125, 
-            7.7631327, 2.51019404
-        ]
-        if randomize:
-            # Adopted from Tobago by Holger Diedam, Michael Engelhart and Sebastian Sager
-            # See https://sourceforge.net/projects/tobago/
-            self.rnd_machines_50 = [
-                4.0 * x - 2.0 for x in np.random.random(size=14)
-            ]
-            
-            self.rnd_machines_100 = [
-                6.0 * x - 3.0 for x in np.random.random(size=14)
-            ]
-            
-            self.rnd_customer_interest = [
-                100 * x - 50 for x in np.random.random(size=14)
-            ]
-            
-            self.rnd_material_price = [
-                2 + 6.5 * x for x in np.random.random(size=14)
-            ]
-        
-        self.current_state = None
-        if ts_state:
-            self.current_state = Tailorshop_State.from_ts_state(ts_state)
-        else:   
-            self.current_state = Tailorshop_State()
-        self.last_actions = None
-        if initial_actions:
-            self.last_actions = copy(initial_actions)
-            self.last_actions.use_steps = use_steps
-        else:
-            self.last_actions = Controllable_Variables(use_steps=use_steps)
-        
-        self.initial_state = copy(self.current_state)
-        self.initial_actions = copy(self.last_actions)
+@njit(cache=True)
+def _shirts_demand(actions : np.ndarray, ts_state : np.ndarray) -> float:
+    base_demand = (ts_state[STATE_CUSTOMER_INTEREST] / 2) + 280
+    shirt_price = actions[ACTION_SHIRT_PRICE]
+    # The base 2.7181 is part of the model (it is not exactly e), so it is kept as is.
+    # math.pow is the same C pow as np.power, but avoids the ufunc dispatch on scalars
+    demand_elasticity = (1.25 * math.pow(2.7181, (-1 * (shirt_price * shirt_price) / 4250)))
+    return  base_demand * demand_elasticity
+
+""" Helper function for buying/selling assets.
+
+    Parameters
+    ----------
+
+    number : float
+        The number of assets to buy/sell.
+
+    buying_price : float
+        The value of the asset when buying it.
     
-    """ Resets the tailorshop simulation.
+    selling_price:
+        The value of the asset when selling it.
 
-    """
-    def reset(self) -> None:
-        self.current_state = copy(self.initial_state)
-        self.last_actions = copy(self.initial_actions)
+    Returns
+    -------
+    float
+        Total cost/profit for the transaction.
 
-    """ Calculates the production capacity for 50-shirts-producing machines.
+    """
+@njit(cache=True)
+def _trade(number : float, buying_price : float, selling_price : float) -> float:
+    # Select the price instead of branching over two returns,
+    # so that the compiled code can use a conditional move
+    price = buying_price if number > 0 else selling_price
+    return number * price
+
+""" Calculates the cost of investments for outlets and machines.
+    If outlets or machines are sold, the value is negative (i.e., profit),
+    but different weights are used for buying and selling are used.
 
     Parameters
     ----------
 
-    actions: Controllable_Variables
-        The current actions/state of the controllable variables.
+    actions: np.ndarray
+        The current actions/state of the controllable variables (see ACTION_FIELDS).
 
-    ts_state : Tailorshop_State
-        The state of the non-controllable tailorshop variables.
+    last_actions: np.ndarray
+        The actions/state of the controllable variables performed in the previous turn.
+
+    ts_state : np.ndarray
+        The state of the non-controllable tailorshop variables (see STATE_FIELDS).
+
+    params : np.ndarray
+        The simulation parameters (see Tailorshop._parameters_array).
 
     Returns
     -------
     float
-        Capacity of the machines-50.
+        Costs of investments or profits from buying/selling outlets/machines.
 
     """
-    def _production_capacity_50(self, actions: Controllable_Variables, 
-                                ts_state : Tailorshop_State) -> float:
-        turn = ts_state.turn
-        capacity_m50 = ts_state.machine_capacity + self.rnd_machines_50[turn -1]
-        workers_m50 = min(actions.machines50, actions.workers50)
-        satisfaction_effect = np.sqrt(np.abs(ts_state.worker_satisfaction))
-        return workers_m50 * capacity_m50 * satisfaction_effect
-    
-    """ Calculates the production capacity for 100-shirts-producing machines.
+@njit(cache=True)
+def _investments_machines_outlets(actions : np.ndarray, last_actions : np.ndarray, 
+                                  ts_state : np.ndarray, params : np.ndarray) -> float:
+    # Machines are traded at the condition before the step, whereas the company value
+    # uses the condition after it, so the two ratios cannot be shared.
+    # Multiplying by a reciprocal instead of dividing would not give identical results.
+    machineCondition = ts_state[STATE_MACHINE_CAPACITY] / params[PARAM_MAX_MACHINE_CAPACITY]
+    price_outlet = params[PARAM_PRICE_OUTLET]
+    price_machine50 = params[PARAM_PRICE_MACHINE50]
+    price_machine100 = params[PARAM_PRICE_MACHINE100]
+    trade_outlets = _trade(actions[ACTION_OUTLETS] - last_actions[ACTION_OUTLETS],
+                           price_outlet, 
+                           0.8 * price_outlet - (100 * ts_state[STATE_TURN]))        
+    trade_m50 = _trade(actions[ACTION_MACHINES50] - last_actions[ACTION_MACHINES50],
+                       price_machine50, 
+                       0.8 * price_machine50 * machineCondition)
+    trade_m100 = _trade(actions[ACTION_MACHINES100] - last_actions[ACTION_MACHINES100],
+                        price_machine100, 
+                        0.8 * price_machine100 * machineCondition)
+    return trade_outlets + trade_m50 + trade_m100
+
+""" Calculates the regular expenses consisting of
+    material orders, salaries and worker benefits, rent
+    and storage costs.
 
     Parameters
     ----------
 
-    actions: Controllable_Variables
-        The current actions/state of the controllable variables.
+    actions: np.ndarray
+        The current actions/state of the controllable variables (see ACTION_FIELDS).
 
-    ts_state : Tailorshop_State
-        The state of the non-controllable tailorshop variables.
+    ts_state : np.ndarray
+        The state of the non-controllable tailorshop variables (see STATE_FIELDS).
+
+    params : np.ndarray
+        The simulation parameters (see Tailorshop._parameters_array).
 
     Returns
     -------
     float
-        Capacity of the machines-100.
+        Regular expenses
 
     """
-    def _production_capacity_100(self, actions: Controllable_Variables, 
-                                 ts_state : Tailorshop_State) -> float:
-        turn = ts_state.turn
-        capacity_m100 = (2 * ts_state.machine_capacity) + self.rnd_machines_100[turn -1]
-        workers_m100 = min(actions.machines100, actions.workers100)
-        satisfaction_effect = np.sqrt(np.abs(ts_state.worker_satisfaction))
-        return workers_m100 * capacity_m100 * satisfaction_effect
+@njit(cache=True)
+def _regular_expenses(actions : np.ndarray, ts_state : np.ndarray, 
+                      params : np.ndarray) -> float:
+    material = actions[ACTION_MATERIAL_ORDER] * ts_state[STATE_MATERIAL_PRICE]
+    # Salary and benefits are multiplied separately (as in the original implementation), 
+    # since a single product would round differently for non-integral actions
+    num_workers = actions[ACTION_WORKERS50] + actions[ACTION_WORKERS100]
+    worker_salary = actions[ACTION_WORKERS_SALARY] * num_workers
+    worker_benefits = actions[ACTION_WORKER_BENEFITS] * num_workers
+
+    outlets = actions[ACTION_OUTLETS] * params[PARAM_OUTLET_RENT]
+    location = params[PARAM_RENT_SUBURB + int(actions[ACTION_LOCATION])]
+    
+    storage = ts_state[STATE_SHIRT_STOCK] + (0.5 * ts_state[STATE_MATERIAL_STOCK])
+    
+    expenses = material + worker_salary + worker_benefits + actions[ACTION_ADVERTISING] \
+                + outlets + location + actions[ACTION_MACHINES_MAINTENANCE] + storage
+    return expenses
 
-    """ Calculates the demand for shirts.
+""" Calculates the customer interest.
+    The interest is influenced by advertising as well as by
+    the location and number of outlet stores.
+    Note that this value is not the demand.
 
     Parameters
     ----------
 
-    actions: Controllable_Variables
-        The current actions/state of the controllable variables.
+    actions: np.ndarray
+        The current actions/state of the controllable variables (see ACTION_FIELDS).
 
-    ts_state : Tailorshop_State
-        The state of the non-controllable tailorshop variables.
+    rnd_customer_interest : float
+        The random fluctuation of the customer interest for the current turn.
+
+    params : np.ndarray
+        The simulation parameters (see Tailorshop._parameters_array).
 
     Returns
     -------
     float
-        Demand for shirts.
+        Customer interest.
 
     """
-    def _shirts_demand(self, actions: Controllable_Variables, 
-                       ts_state : Tailorshop_State) -> float:
-        base_demand = (ts_state.customer_interest / 2) + 280
-        demand_elasticity = (1.25 * np.power(2.7181, (-1 * (np.power(actions.shirt_price, 2)) / 4250)))
-        return  base_demand * demand_elasticity
+@njit(cache=True)
+def _customer_interest(actions : np.ndarray, rnd_customer_interest : float, 
+                       params : np.ndarray) -> float:
+    advertising_effect = min((actions[ACTION_ADVERTISING] / 5), params[PARAM_MAX_ADVERTISING_EFFECT])
+    outlet_effect = 100 * actions[ACTION_OUTLETS]
+    location_factor = 1 + (actions[ACTION_LOCATION] / 10)
 
-    """ Calculates the cost of investments for outlets and machines.
-    If outlets or machines are sold, the value is negative (i.e., profit),
-    but different weights are used for buying and selling are used.
+    result = ((advertising_effect + outlet_effect) * location_factor) + rnd_customer_interest
+    return result
+
+""" Calculates the total company value.
+    This value is usually the optimization goal for the task.
 
     Parameters
     ----------
 
-    actions: Controllable_Variables
-        The current actions/state of the controllable variables.
+    actions: np.ndarray
+        The current actions/state of the controllable variables (see ACTION_FIELDS).
 
-    last_actions: Controllable_Variables
-        The actions/state of the controllable variables performed in the previous turn.
+    ts_state : np.ndarray
+        The state of the non-controllable tailorshop variables (see STATE_FIELDS).
 
-    ts_state : Tailorshop_State
-        The state of the non-controllable tailorshop variables.
+    params : np.ndarray
+        The simulation parameters (see Tailorshop._parameters_array).
 
     Returns
     -------
     float
-        Costs of investments or profits from buying/selling outlets/machines.
+        Total company value.
 
     """
-    def _investments_machines_outlets(self, actions: Controllable_Variables, 
-                                      last_actions : Controllable_Variables, 
-                                      ts_state : Tailorshop_State) -> float:
-        machineCondition = ts_state.machine_capacity / self.max_machine_capacity
-        trade_outlets = self._trade(actions.outlets - last_actions.outlets,
-                                    self.price_outlet, 
-                                    0.8 * self.price_outlet - (100 * ts_state.turn))        
-        trade_m50 = self._trade(actions.machines50 - last_actions.machines50,
-                                    self.price_machine50, 
-                                    0.8 * self.price_machine50 * machineCondition)
-        trade_m100 = self._trade(actions.machines100 - last_actions.machines100,
-                                    self.price_machine100, 
-                                    0.8 * self.price_machine100 * machineCondition)
-        return trade_outlets + trade_m50 + trade_m100
+@njit(cache=True)
+def _company_value(actions : np.ndarray, ts_state : np.ndarray, params : np.ndarray) -> float:
+    turn = ts_state[STATE_TURN]
+    machine_condition = ts_state[STATE_MACHINE_CAPACITY] / params[PARAM_MAX_MACHINE_CAPACITY]
+
+    bank = ts_state[STATE_BANK_ACCOUNT]
+    machines_50 = actions[ACTION_MACHINES50] * (machine_condition * params[PARAM_PRICE_MACHINE50])
+    machines_100 = actions[ACTION_MACHINES100] * (machine_condition * params[PARAM_PRICE_MACHINE100])
+    outlets = (actions[ACTION_OUTLETS] * params[PARAM_PRICE_OUTLET] - (turn * 100))
+    material = ts_state[STATE_MATERIAL_STOCK] * 2
+    shirts = ts_state[STATE_SHIRT_STOCK] * 20
+    
+    return bank + machines_50 + machines_100 + outlets + material + shirts
 
-    """ Helper function for buying/selling assets.
+""" Rounds the state variables in-place (see Tailorshop_State.round_and_update).
+    Worker satisfaction and production idle are not rounded.
 
     Parameters
     ----------
 
-    number : float
-        The number of assets to buy/sell.
+    ts_state : np.ndarray
+        The state of the non-controllable tailorshop variables (see STATE_FIELDS).
 
-    buying_price : float
-        The value of the asset when buying it.
+    """
+@njit(cache=True)
+def _round_state(ts_state : np.ndarray) -> None:
+    for idx in (STATE_BANK_ACCOUNT, STATE_SHIRT_SALES, STATE_MATERIAL_PRICE, 
+                STATE_SHIRT_STOCK, STATE_COMPANY_VALUE, STATE_CUSTOMER_INTEREST, 
+                STATE_MATERIAL_STOCK, STATE_MACHINE_CAPACITY):
+        # Adding 0.0 turns a negative zero into zero (as rounding to an int does)
+        ts_state[idx] = np.rint(ts_state[idx]) + 0.0
+
+""" Calculates the successor state for a given state based on given new actions.
+    This is the numeric core of Tailorshop.calculate_step, operating on the
+    array representations of the state and the actions. The returned state is
+    already rounded (see _round_state).
+
+    Parameters
+    ----------
+
+    actions: np.ndarray
+        The actions/state of the controllable variables that should be applied (see ACTION_FIELDS).
+
+    last_actions: np.ndarray
+        The previous actions/state of the controllable variables (see ACTION_FIELDS).
+
+    ts_state : np.ndarray
+        The state of the non-controllable tailorshop variables (see STATE_FIELDS).
+
+    rnd_machines_50 : float
+        Random fluctuation of the machine-50 capacity for the current turn.
+
+    rnd_machines_100 : float
+        Random fluctuation of the machine-100 capacity for the current turn.
+
+    rnd_customer_interest : float
+        Random fluctuation of the customer interest for the current turn.
+
+    rnd_material_price : float
+        Material price for the next turn (before rounding).
+
+    params : np.ndarray
+        The simulation parameters (see Tailorshop._parameters_array).
+
+    Returns
+    -------
+    np.ndarray
+        The successor state (see STATE_FIELDS).
+
+    """
+@njit(cache=True)
+def _step_kernel(actions : np.ndarray, last_actions : np.ndarray, ts_state : np.ndarray,
+                 rnd_machines_50 : float, rnd_machines_100 : float, 
+                 rnd_customer_interest : float, rnd_material_price : float,
+                 params : np.ndarray) -> np.ndarray:
+    # Every variable of the successor state is calculated below, so nothing is copied
+    new_state = np.empty(ts_state.shape[0])
+
+    # calculate the total available material
+    material_before_production = ts_state[STATE_MATERIAL_STOCK] + actions[ACTION_MATERIAL_ORDER]
     
-    selling_price:
-        The value of the asset when selling it.
+    # Calculate the machine capacity
+    # Without machines, there is nothing to maintain
+    num_of_machines = actions[ACTION_MACHINES50] + actions[ACTION_MACHINES100]
+    maintenance_per_machine = actions[ACTION_MACHINES_MAINTENANCE] / num_of_machines \
+        if num_of_machines > 0 else 0.0
+    machine_capacity = (0.9 * ts_state[STATE_MACHINE_CAPACITY]) + (maintenance_per_machine * 0.017)
+    new_state[STATE_MACHINE_CAPACITY] = machine_capacity
+    
+    # Calculate worker satisfaction
+    satisfaction = (0.5 + ((actions[ACTION_WORKERS_SALARY] - 850) / 550) + (actions[ACTION_WORKER_BENEFITS] / 800))
+    new_state[STATE_WORKER_SATISFACTION] = satisfaction
+
+     # Calculate production
+    production_capacity = _production_capacity(actions, new_state, 
+                                               rnd_machines_50, rnd_machines_100)
+    actual_production = min(material_before_production, production_capacity)
+    
+    production_idle = 0.0
+    if production_capacity != 0:
+        production_idle = (production_capacity - actual_production) / production_capacity
+    new_state[STATE_PRODUCTION_IDLE] = production_idle
+    new_state[STATE_MATERIAL_STOCK] = material_before_production - actual_production
+
+    # Calculate shirt sales
+    shirts_before_sales = ts_state[STATE_SHIRT_STOCK] + actual_production
+    current_demand = _shirts_demand(actions, ts_state)
+    
+    shirt_sales = min(shirts_before_sales, current_demand)
+    new_state[STATE_SHIRT_SALES] = shirt_sales
+
+    sales_revenue = shirt_sales * actions[ACTION_SHIRT_PRICE]
+    new_state[STATE_SHIRT_STOCK] = shirts_before_sales - shirt_sales
+
+    # Calculate investments
+    investments = _investments_machines_outlets(actions, last_actions, ts_state, params)
+    expenses = _regular_expenses(actions, ts_state, params)
+
+    # Calculate interest
+    # Select the rate (instead of branching), so that the compiled code can use a conditional move
+    bank_account = ts_state[STATE_BANK_ACCOUNT]
+    interest_rate = params[PARAM_POSITIVE_INTEREST] if bank_account > 0 else params[PARAM_NEGATIVE_INTEREST]
+    interest = bank_account * interest_rate
+
+    new_state[STATE_BANK_ACCOUNT] = bank_account + interest + sales_revenue - investments - expenses
+
+    # Calculate customer interest
+    new_state[STATE_CUSTOMER_INTEREST] = _customer_interest(actions, rnd_customer_interest, params)
+    
+    # New material price
+    new_state[STATE_MATERIAL_PRICE] = np.rint(rnd_material_price)
+
+    new_state[STATE_TURN] = ts_state[STATE_TURN] + 1
+
+    # New company value
+    new_state[STATE_COMPANY_VALUE] = _company_value(actions, new_state, params)
+
+    _round_state(new_state)
+    return new_state
+
+""" Helper function calculating the successor state of a single member of a batch
+    (see _step_batch_kernel), which is written to column i of new_states.
+
+    """
+@njit(cache=True)
+def _step_batch_member(actions : np.ndarray, last_actions : np.ndarray, 
+                       ts_states : np.ndarray, rnd : np.ndarray, params : np.ndarray, 
+                       new_states : np.ndarray, i : int) -> None:
+    rnd_idx = int(ts_states[STATE_TURN, i]) - 1
+    new_states[:, i] = _step_kernel(actions[:, i], last_actions[:, i], ts_states[:, i], 
+                                    rnd[RND_MACHINES_50, rnd_idx], 
+                                    rnd[RND_MACHINES_100, rnd_idx], 
+                                    rnd[RND_CUSTOMER_INTEREST, rnd_idx], 
+                                    rnd[RND_MATERIAL_PRICE, rnd_idx], 
+                                    params)
+
+""" Calculates the (rounded) successor states for a batch of states and actions.
+    The batch is stored field-wise (structure of arrays): every row holds 
+    one of the variables for all members of the batch.
+
+    Parameters
+    ----------
+
+    actions : np.ndarray
+        The actions to apply, shape (len(ACTION_FIELDS), batch size).
+
+    last_actions : np.ndarray
+        The actions that directly led to the states, shape (len(ACTION_FIELDS), batch size).
+
+    ts_states : np.ndarray
+        The states of the non-controllable tailorshop variables, 
+        shape (len(STATE_FIELDS), batch size).
+
+    rnd : np.ndarray
+        The random variables, one row per kind of variable (see RND_*) 
+        and one column per turn.
+
+    params : np.ndarray
+        The simulation parameters (see Tailorshop._parameters_array).
 
     Returns
     -------
-    float
-        Total cost/profit for the transaction.
+    np.ndarray
+        The successor states, shape (len(STATE_FIELDS), batch size).
 
     """
-    @staticmethod
-    def _trade(number : float, buying_price : float, selling_price : float) -> float:
-        if number > 0:
-            return number * buying_price
-        else:
-            return number * selling_price
+@njit(cache=True)
+def _step_batch_kernel(actions : np.ndarray, last_actions : np.ndarray, 
+                       ts_states : np.ndarray, rnd : np.ndarray, 
+                       params : np.ndarray) -> np.ndarray:
+    new_states = np.empty_like(ts_states)
+    for i in range(ts_states.shape[1]):
+        _step_batch_member(actions, last_actions, ts_states, rnd, params, new_states, i)
+    return new_states
+
+""" Parallel version of _step_batch_kernel, which distributes the members 
+    of the batch over all CPU cores (see numba.set_num_threads).
+    It is used when the kernels are compiled at runtime, since ahead-of-time 
+    compiled modules (see build_kernel.py) do not support parallel loops.
 
-    """ Calculates the regular expenses consisting of
-    material orders, salaries and worker benefits, rent
-    and storage costs.
+    Parameters
+    ----------
+
+    See _step_batch_kernel.
+
+    Returns
+    -------
+    np.ndarray
+        The successor states, shape (len(STATE_FIELDS), batch size).
+
+    """
+@njit(cache=True, parallel=True)
+def _step_batch_kernel_parallel(actions : np.ndarray, last_actions : np.ndarray, 
+                                ts_states : np.ndarray, rnd : np.ndarray, 
+                                params : np.ndarray) -> np.ndarray:
+    new_states = np.empty_like(ts_states)
+    for i in prange(ts_states.shape[1]):
+        _step_batch_member(actions, last_actions, ts_states, rnd, params, new_states, i)
+    return new_states
+
+""" Calculates a whole trajectory of (rounded) successor states
+    for a sequence of actions in a single call.
 
     Parameters
     ----------
 
-    actions: Controllable_Variables
-        The current actions/state of the controllable variables.
+    action_seq : np.ndarray
+        The actions to apply, one row per step (see ACTION_FIELDS).
 
-    ts_state : Tailorshop_State
-        The state of the non-controllable tailorshop variables.
+    last_actions : np.ndarray
+        The actions that directly led to the start state (see ACTION_FIELDS).
+
+    ts_state : np.ndarray
+        The start state of the non-controllable tailorshop variables (see STATE_FIELDS).
+
+    rnd : np.ndarray
+        The random variables, one row per kind of variable (see RND_*) 
+        and one column per turn.
+
+    params : np.ndarray
+        The simulation parameters (see Tailorshop._parameters_array).
 
     Returns
     -------
-    float
-        Regular expenses
+    np.ndarray
+        The successor states, one row per step (see STATE_FIELDS).
 
     """
-    def _regular_expenses(self, actions: Controllable_Variables, 
-                          ts_state : Tailorshop_State) -> float:        
-        material = actions.material_order * ts_state.material_price
-        num_workers = actions.workers50 + actions.workers100
-        worker_salary = actions.workers_salary * num_workers
-        worker_benefits = actions.worker_benefits * num_workers
+@njit(cache=True)
+def _trajectory_kernel(action_seq : np.ndarray, last_actions : np.ndarray, 
+                       ts_state : np.ndarray, rnd : np.ndarray, 
+                       params : np.ndarray) -> np.ndarray:
+    out_states = np.empty((action_seq.shape[0], ts_state.shape[0]))
+    state = ts_state
+    previous_actions = last_actions
+    for t in range(action_seq.shape[0]):
+        rnd_idx = int(state[STATE_TURN]) - 1
+        state = _step_kernel(action_seq[t], previous_actions, state, 
+                             rnd[RND_MACHINES_50, rnd_idx], rnd[RND_MACHINES_100, rnd_idx], 
+                             rnd[RND_CUSTOMER_INTEREST, rnd_idx], rnd[RND_MATERIAL_PRICE, rnd_idx], 
+                             params)
+        out_states[t] = state
+        previous_actions = action_seq[t]
+    return out_states
+
+""" Helper function creating a property for one kind of random variables,
+    which are stored as a row of Tailorshop._rnd.
+    The getter returns a read-only view, so the random variables can only be 
+    changed by assigning a whole sequence, which invalidates the memoized transitions.
+    The sequences may differ in length; the simulation ends when the shortest one is depleted.
 
-        outlets = actions.outlets * self.outlet_rent
-        location = self.locations_rents[actions.location]
+    Parameters
+    ----------
+
+    index : int
+        Row of the random variables (see RND_*).
+
+    Returns
+    -------
+    property
+        Property accessing the random variables (per turn).
+
+    """
+def _rnd_property(index : int) -> property:
+    def getter(self) -> np.ndarray:
+        values = self._rnd[index, :self._rnd_lengths[index]].view()
+        values.flags.writeable = False
+        return values
+    def setter(self, values : np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim != 1:
+            raise ValueError("Expected a sequence of random variables (one per turn).")
+        # Rows may have different lengths, the unused entries are padded with NaN
+        num_turns = len(values)
+        if num_turns > self._rnd.shape[1]:
+            padding = np.full((self._rnd.shape[0], num_turns - self._rnd.shape[1]), np.nan)
+            self._rnd = np.concatenate((self._rnd, padding), axis=1)
+        self._rnd[index, :num_turns] = values
+        self._rnd[index, num_turns:] = np.nan
+        self._rnd_lengths[index] = num_turns
+        # The simulation ends when the shortest sequence is depleted
+        self._max_turn = min(self._rnd_lengths)
+        self._transition_cache.clear()
+    return property(getter, setter)
+
+class _ParameterProperty(property):
+    """ Property of a simulation parameter, which returns the default value 
+    when accessed on the class (e.g., Tailorshop.price_outlet).
+
+    """
+    default = None
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self.default
+        return super().__get__(instance, owner)
+
+""" Helper function creating a property for one of the simulation parameters
+    that are passed to the step kernel (see Tailorshop._parameters_array).
+    Assigning the parameter on an instance rebuilds the parameter array 
+    and clears the memoized transitions.
+
+    Parameters
+    ----------
+
+    name : str
+        Name of the parameter.
+
+    default : Any
+        Value of the parameter, unless it is assigned on an instance.
+
+    Returns
+    -------
+    _ParameterProperty
+        Property accessing the parameter.
+
+    """
+def _parameter_property(name : str, default) -> _ParameterProperty:
+    attribute = "_" + name
+    def getter(self):
+        return getattr(self, attribute, default)
+    def setter(self, value) -> None:
+        setattr(self, attribute, value)
+        # Parameters can also be assigned before the constructor ran (e.g., by subclasses)
+        if "_params" in self.__dict__:
+            self._params = self._parameters_array()
+            self._transition_cache.clear()
+    parameter = _ParameterProperty(getter, setter)
+    parameter.default = default
+    return parameter
+
+class Tailorshop:
+    """ Main class for the Tailorshop simulation. 
+    Instantiates the simulation and allows to update it with given actions.
+
+    """
+    # Simulation parameters. They can be overridden by subclasses or by assigning 
+    # them on an instance; the latter rebuilds the parameters passed to the 
+    # step kernel (see _parameter_property). Changing them in place (e.g., an item of 
+    # locations_rents) or on the class after instantiation is not detected.
+    positive_interest = _parameter_property("positive_interest", POSITIVE_INTEREST)
+    negative_interest = _parameter_property("negative_interest", NEGATIVE_INTEREST)
+    max_machine_capacity = _parameter_property("max_machine_capacity", MAX_MACHINE_CAPACITY)
+    max_advertising_effect = _parameter_property("max_advertising_effect", MAX_ADVERTISING_EFFECT)
+    max_worker_satisfaction = MAX_WORKER_SATISFACTION
+    locations_rents = _parameter_property("locations_rents", LOCATIONS_RENTS)
+    outlet_rent = _parameter_property("outlet_rent", OUTLET_RENT)
+    cash_injection = CASH_INJECTION
+    price_machine50 = _parameter_property("price_machine50", PRICE_MACHINE50)
+    price_machine100 = _parameter_property("price_machine100", PRICE_MACHINE100)
+    price_outlet = _parameter_property("price_outlet", PRICE_OUTLET)
+
+    _parameter_names = ("positive_interest", "negative_interest", "max_machine_capacity", 
+                        "max_advertising_effect", "locations_rents", "outlet_rent", 
+                        "price_machine50", "price_machine100", "price_outlet")
+
+    rnd_machines_50 = _rnd_property(RND_MACHINES_50)
+    rnd_machines_100 = _rnd_property(RND_MACHINES_100)
+    rnd_customer_interest = _rnd_property(RND_CUSTOMER_INTEREST)
+    rnd_material_price = _rnd_property(RND_MATERIAL_PRICE)
+
+    """ Instantiates the Tailorshop simulation.
+
+    Parameters
+    ----------
+    ts_state : Tailorshop_State
+        The initial state or None. 
+        When no state is given, default initialization values are used.
+
+    initial_actions : Controllable_Variables
+        The initial state of the controllable variables or None. 
+        When no actions are given, default values are used.
+    
+    randomize : bool
+        When set to true, the dynamic effects parameters are generated randomly.
+        Otherwise, a fixed initialization is used.
+    
+    use_steps : bool
+        If true, the controllable variables can only be changed using the default stepsize,
+        and values not aligning with the stepsizes will be altered automatically.
+        Otherwise, all values within min/max limits are allowed.
+
+    cache_size : int
+        Maximum number of transitions (state, actions, last actions -> successor) 
+        that are memoized by calculate_step. When set to 0 (default), no transitions 
+        are cached. Caching only pays off when the same states are stepped repeatedly 
+        (e.g., when testing many actions on the same state), since the turn is part 
+        of the state and never repeats in a regular run. The cache is cleared whenever the random variables (rnd_* properties) are assigned.
+
+    rng : np.random.Generator
+        Random number generator used when randomize is set (e.g., np.random.default_rng(seed)).
+        When None, numpy's global random state is used (see np.random.seed).
+
+    """
+    def __init__(self, ts_state : Tailorshop_State = None, 
+                 initial_actions : Controllable_Variables = None, 
+                 randomize : bool = False, use_steps : bool = True,
+                 cache_size : int = 0, rng : np.random.Generator = None) -> None:
+        # Initialize random variables, one row per kind of variable (see RND_*)
+        # and one column per turn
+        self._rnd = np.array([
+            [
+                -1.6794734, 0.3962952, -1.2906776, -1.69717836, 
+                0.6770368, 0.3517432, -1.5712524, 1.154388, 
+                -0.5179668, 1.634584, -1.3330284, -0.9713408, 
+                0.1261412, 0.8854424
+            ],
+            [
+                -0.8060082, 1.3505922, -1.7557848, -2.44459788, 
+                -1.0919448, -2.66181528, 0.2626608, -2.0520366, 
+                1.4789304, -1.7724894, -1.1784876, 1.6133514, 
+                0.6488046, 1.135758
+            ],
+            [
+                -23.04985, 19.2422, 34.44874, 19.7927,
+                -24.671, 30.50709, -4.26652, 38.93418, 
+                -12.88273, -47.064686, -13.75205, -49.315691, 
+                25.20559, 30.6675
+            ],
+            [
+                8.2671817, 4.8714296, 4.8530515, 5.9098319,
+                5.18731075, 7.09909075, 6.772157, 7.6171843, 
+                8.02385095, 2.6811532, 5.0227145, 6.29710125, 
+                7.7631327, 2.51019404
+            ]
+        ], dtype=np.float64)
+        if randomize:
+            # Adopted from Tobago by Holger Diedam, Michael Engelhart and Sebastian Sager
+            # See https://sourceforge.net/projects/tobago/
+            random_source = np.random if rng is None else rng
+            # A single draw for all rows (row by row, so the values are the same 
+            # as when drawing each row separately)
+            uniform = random_source.random(size=self._rnd.shape)
+            self._rnd[RND_MACHINES_50] = 4.0 * uniform[RND_MACHINES_50] - 2.0
+            self._rnd[RND_MACHINES_100] = 6.0 * uniform[RND_MACHINES_100] - 3.0
+            self._rnd[RND_CUSTOMER_INTEREST] = 100 * uniform[RND_CUSTOMER_INTEREST] - 50
+            self._rnd[RND_MATERIAL_PRICE] = 2 + 6.5 * uniform[RND_MATERIAL_PRICE]
         
-        storage = ts_state.shirt_stock + (0.5 * ts_state.material_stock)
+        # Number of turns for which random variables are prepared (per row and overall).
+        # Both are updated when one of the rnd_* properties is assigned.
+        self._rnd_lengths = [self._rnd.shape[1]] * self._rnd.shape[0]
+        self._max_turn = self._rnd.shape[1]
+
+        self.current_state = None
+        if ts_state:
+            self.current_state = Tailorshop_State.from_ts_state(ts_state)
+        else:   
+            self.current_state = Tailorshop_State()
+        self.last_actions = None
+        if initial_actions:
+            self.last_actions = copy(initial_actions)
+            self.last_actions.use_steps = use_steps
+        else:
+            self.last_actions = Controllable_Variables(use_steps=use_steps)
         
-        expenses = material + worker_salary + worker_benefits + actions.advertising \
-                    + outlets + location + actions.machines_maintenance + storage
-        return expenses
+        # The state was validated above, so it does not need to be clamped again
+        self.initial_state = self.current_state.clone()
+        self.initial_actions = copy(self.last_actions)
+
+        # Simulation parameters passed to the step kernel
+        self._params = self._parameters_array()
+
+        # Memoized transitions of calculate_step (least recently used ones are dropped).
+        # The random variables are fixed per instance, so the arrays of the state 
+        # and the (last) actions determine the successor.
+        self._transition_cache : OrderedDict[bytes, np.ndarray] = OrderedDict()
+        self._cache_size = cache_size
+    
+    """ Resets the tailorshop simulation.
+    A new state object is created, so states obtained from current_state 
+    before the reset keep their values.
+
+    """
+    def reset(self) -> None:
+        self.current_state = self.initial_state.clone()
+        self.last_actions = self.initial_actions.clone()
 
     """ Calculates the customer interest.
     The interest is influenced by advertising as well as by
@@ -303,43 +813,41 @@ class Tailorshop:
 
     """
     def customer_interest(self, actions: Controllable_Variables, ts_state : Tailorshop_State) -> float:
-        advertising_effect = min((actions.advertising / 5), Tailorshop.max_advertising_effect)
-        outlet_effect = 100 * actions.outlets
-        location_factor = 1 + (actions.location / 10)
-        random_fluctuation = self.rnd_customer_interest[ts_state.turn - 1]
-
-        result = ((advertising_effect + outlet_effect) * location_factor) + random_fluctuation
-        return result
-
-    """ Calculates the total company value.
-    This value is usually the optimization goal for the task.
-
-    Parameters
-    ----------
+        random_fluctuation = self._rnd[RND_CUSTOMER_INTEREST, ts_state.turn - 1]
+        return _customer_interest(actions.to_array(), random_fluctuation, self._params)
 
-    actions: Controllable_Variables
-        The current actions/state of the controllable variables.
-
-    ts_state : Tailorshop_State
-        The state of the non-controllable tailorshop variables.
+    """ Collects the simulation parameters (class constants) into an array
+    that can be passed to the step kernel.
 
     Returns
     -------
-    float
-        Total company value.
+    np.ndarray
+        Simulation parameters.
 
     """
-    def _company_value(self, actions: Controllable_Variables, ts_state : Tailorshop_State) -> float:
-        turn = ts_state.turn
-    
-        bank = ts_state.bank_account
-        machines_50 = actions.machines50 * (ts_state.machine_capacity / self.max_machine_capacity * self.price_machine50)
-        machines_100 = actions.machines100 * (ts_state.machine_capacity / self.max_machine_capacity * self.price_machine100)
-        outlets = (actions.outlets * self.price_outlet - (turn * 100))
-        material = ts_state.material_stock * 2
-        shirts = ts_state.shirt_stock * 20
-        
-        return bank + machines_50 + machines_100 + outlets + material + shirts
+    def _parameters_array(self) -> np.ndarray:
+        params = np.empty(NUM_PARAMS, dtype=np.float64)
+        params[PARAM_POSITIVE_INTEREST] = self.positive_interest
+        params[PARAM_NEGATIVE_INTEREST] = self.negative_interest
+        params[PARAM_MAX_MACHINE_CAPACITY] = self.max_machine_capacity
+        params[PARAM_MAX_ADVERTISING_EFFECT] = self.max_advertising_effect
+        params[PARAM_RENT_SUBURB:PARAM_RENT_INNER_CITY + 1] = self.locations_rents
+        params[PARAM_OUTLET_RENT] = self.outlet_rent
+        params[PARAM_PRICE_MACHINE50] = self.price_machine50
+        params[PARAM_PRICE_MACHINE100] = self.price_machine100
+        params[PARAM_PRICE_OUTLET] = self.price_outlet
+        return params
+
+    """ Turns simulation parameters overridden by a subclass (as plain class attributes)
+    into parameter properties, so that assigning them on an instance is still detected.
+
+    """
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        for name in Tailorshop._parameter_names:
+            value = cls.__dict__.get(name)
+            if value is not None and not isinstance(value, _ParameterProperty):
+                setattr(cls, name, _parameter_property(name, value))
 
     """ Determines if the simulation is over.
 
@@ -367,13 +875,13 @@ class Tailorshop:
 
     """
     def _is_finished(self, ts_state : Tailorshop_State) -> bool:
-        return (ts_state.turn >= len(self.rnd_material_price)) or (ts_state.turn >= len(self.rnd_customer_interest)) \
-            or (ts_state.turn >= len(self.rnd_machines_100)) or (ts_state.turn >= len(self.rnd_machines_50))
+        return ts_state.turn >= self._max_turn
 
     """ Calculates the successor state for a given state based on 
     given new actions.
     Note that this function does not alter the states in-place, so it can be used
-    to test various outcomes on the same state.
+    to test various outcomes on the same state. Repeated transitions can be 
+    served from a cache (see cache_size).
 
     Parameters
     ----------
@@ -399,73 +907,88 @@ class Tailorshop:
         if self._is_finished(ts_state):
             print("Warning: Cannot perform step when the prepared random variables are depleted.")
             return None
+        if ts_state.turn < 1:
+            raise ValueError("Turns must be at least 1.")
+
+        # Marshal the objects into arrays (per call, so that calls do not share 
+        # any buffers; note that the transition cache itself is not thread-safe)
+        actions_array = actions.to_array()
+        last_actions_array = last_actions.to_array()
+        state_array = ts_state.to_array()
+
+        # Look up the transition (if caching is enabled) or run the kernel
+        new_values = None
+        if self._cache_size > 0:
+            key = state_array.tobytes() + actions_array.tobytes() + last_actions_array.tobytes()
+            new_values = self._transition_cache.get(key)
+            if new_values is not None:
+                self._transition_cache.move_to_end(key)
+        if new_values is None:
+            rnd_machines_50, rnd_machines_100, rnd_customer_interest, rnd_material_price = \
+                self._rnd[:, ts_state.turn - 1].tolist()
+            new_values = _step_kernel_impl(actions_array, 
+                                           last_actions_array,
+                                           state_array,
+                                           rnd_machines_50, 
+                                           rnd_machines_100,
+                                           rnd_customer_interest, 
+                                           rnd_material_price,
+                                           self._params)
+            if self._cache_size > 0:
+                self._transition_cache[key] = new_values
+                if len(self._transition_cache) > self._cache_size:
+                    self._transition_cache.popitem(last=False)
+
+        # The kernel already rounded everything
+        return Tailorshop_State.from_array(new_values)
+    
+    """ Calculates the successor states for a whole batch of states and actions 
+    in a single call of the compiled batch kernel (e.g., for evaluating many 
+    candidate actions or rollouts at once).
+    The batch is stored field-wise (structure of arrays): every row holds one 
+    of the variables for all members of the batch, e.g., 
+    np.stack([ts_state.to_array() for ts_state in states], axis=1).
+    Note that the actions are applied as they are, i.e., they are neither clamped 
+    nor stepped, and that the returned states are not cached.
 
-        new_state = Tailorshop_State.from_ts_state(ts_state)
-
-        # calculate the total available material
-        material_before_production = ts_state.material_stock + actions.material_order
-        
-        # Calculate the machine capacity
-        num_of_machines = actions.machines50 + actions.machines100
-        machine_capacity = (0.9 * ts_state.machine_capacity) + ((actions.machines_maintenance / (num_of_machines + 0.00000001)) * 0.017)
-        new_state.machine_capacity = machine_capacity
-        
-        # Calculate worker satisfaction
-        satisfaction = (0.5 + ((actions.workers_salary - 850) / 550) + (actions.worker_benefits / 800))
-        new_state.worker_satisfaction = satisfaction
-
-         # Calculate production
-        production_capacity = self._production_capacity_50(actions, new_state) + self._production_capacity_100(actions, new_state)
-        actual_production = min(material_before_production, production_capacity)
-        
-        production_idle = 0
-        if production_capacity != 0:
-            production_idle = (production_capacity - actual_production) / production_capacity
-        new_state.production_idle = production_idle
-        new_state.material_stock = material_before_production - actual_production
-
-        # Calculate shirt sales
-        shirts_before_sales = ts_state.shirt_stock + actual_production
-        current_demand = self._shirts_demand(actions, ts_state)
-        
-        shirt_sales = min(shirts_before_sales, current_demand)
-        new_state.shirt_sales = shirt_sales
+    Parameters
+    ----------
 
-        sales_revenue = shirt_sales * actions.shirt_price
-        new_state.shirt_stock = shirts_before_sales - shirt_sales
+    actions: np.ndarray
+        The actions to apply, shape (len(ACTION_FIELDS), batch size).
 
-        # Calculate investments
-        investments = self._investments_machines_outlets(actions, last_actions, ts_state)
-        expenses = self._regular_expenses(actions, ts_state)
+    last_actions: np.ndarray
+        The previous actions (that directly led to the states), 
+        shape (len(ACTION_FIELDS), batch size).
 
-        # Calculate interest
-        interest = 0
-        if ts_state.bank_account > 0:
-            interest = ts_state.bank_account * self.positive_interest
-        else:
-            interest = ts_state.bank_account * self.negative_interest
+    ts_states : np.ndarray
+        The states of the non-controllable tailorshop variables,
+        shape (len(STATE_FIELDS), batch size).
 
-        bank_account = ts_state.bank_account + interest + sales_revenue - investments - expenses
-        new_state.bank_account = bank_account
+    Returns
+    -------
+    np.ndarray
+        The (rounded) successor states, shape (len(STATE_FIELDS), batch size).
 
-        # Calculate customer interest
-        customer_interest = self.customer_interest(actions, ts_state)
-        new_state.customer_interest = customer_interest
+    """
+    def calculate_step_batch(self, actions : np.ndarray, last_actions : np.ndarray, 
+                             ts_states : np.ndarray) -> np.ndarray:
+        actions = np.ascontiguousarray(actions, dtype=np.float64)
+        last_actions = np.ascontiguousarray(last_actions, dtype=np.float64)
+        ts_states = np.ascontiguousarray(ts_states, dtype=np.float64)
+        batch_size = ts_states.shape[1] if ts_states.ndim == 2 else -1
+        if ts_states.shape != (len(STATE_FIELDS), batch_size) \
+            or actions.shape != (len(ACTION_FIELDS), batch_size) \
+            or last_actions.shape != (len(ACTION_FIELDS), batch_size):
+            raise ValueError("Expected states of shape ({}, n) and actions of shape ({}, n).".format(
+                len(STATE_FIELDS), len(ACTION_FIELDS)))
+
+        if batch_size > 0 and ts_states[STATE_TURN].min() < 1:
+            raise ValueError("Turns must be at least 1.")
+        if batch_size > 0 and ts_states[STATE_TURN].max() >= self._max_turn:
+            raise Exception("Cannot perform steps when the prepared random variables are depleted.")
         
-        # New material price
-        material_price = round(self.rnd_material_price[ts_state.turn - 1])
-        new_state.material_price = material_price
-
-        new_state.turn = ts_state.turn + 1
-
-        # New company value
-        company_value = self._company_value(actions, new_state)
-        new_state.company_value = company_value
-
-        # round everything and update the shown variables
-        new_state.round_and_update()
-
-        return new_state
+        return _step_batch_kernel_impl(actions, last_actions, ts_states, self._rnd, self._params)
     
     """ Applies given actions and advances the simulation by one step.
     The function alters the internal state of the simulation and is the main 
@@ -482,13 +1005,143 @@ class Tailorshop:
         if self.is_finished():
             raise Exception("Cannot calculate next step once the simulation is finished.")
 
-        last_actions = copy(self.last_actions)
-        next_state = self.calculate_step(actions, last_actions, self.current_state)
-        self.last_actions = copy(actions)
+        # calculate_step only reads the last actions, so they do not need to be copied
+        next_state = self.calculate_step(actions, self.last_actions, self.current_state)
+        self.last_actions = actions.clone()
         self.current_state = next_state
     
+    """ Calculates the trajectory of successor states for a given state based on 
+    a whole sequence of actions. All steps are calculated in a single call of 
+    the compiled trajectory kernel, which is much faster than calling 
+    calculate_step repeatedly (e.g., for evaluating rollouts when planning).
+    Like calculate_step, this function does not alter the simulation.
+    Note that the actions are applied as they are, i.e., they are neither clamped 
+    nor stepped (as done by the setters of Controllable_Variables). 
+    Accordingly, the last actions hold exactly the last row of the sequence.
+
+    Parameters
+    ----------
+
+    action_seq : np.ndarray
+        The actions to apply, one row per step (see ACTION_FIELDS and 
+        Controllable_Variables.to_array).
+
+    last_actions: Controllable_Variables
+        The previous actions/state of the controllable variables (that directly led to the state).
+
+    ts_state : Tailorshop_State
+        The state of the non-controllable tailorshop variables to start from.
+
+    Returns
+    -------
+    np.ndarray
+        The states after each of the steps, one row per step (see STATE_FIELDS).
+
+    """
+    def calculate_trajectory(self, action_seq : np.ndarray, 
+                             last_actions : Controllable_Variables, 
+                             ts_state : Tailorshop_State) -> np.ndarray:
+        action_seq = np.ascontiguousarray(action_seq, dtype=np.float64)
+        if action_seq.ndim != 2 or action_seq.shape[1] != len(ACTION_FIELDS):
+            raise ValueError("Expected actions of shape (steps, {}), got {}.".format(
+                len(ACTION_FIELDS), action_seq.shape))
+        
+        if ts_state.turn < 1:
+            raise ValueError("Turns must be at least 1.")
+        remaining_steps = self._max_turn - ts_state.turn
+        if len(action_seq) > remaining_steps:
+            raise Exception("Cannot calculate {} steps, only {} steps remain in the simulation.".format(
+                len(action_seq), max(remaining_steps, 0)))
+        if len(action_seq) == 0:
+            return np.empty((0, len(STATE_FIELDS)))
+        
+        return _trajectory_kernel_impl(action_seq, last_actions.to_array(), 
+                                       ts_state.to_array(), self._rnd, self._params)
+
+    """ Calculates the trajectories for a whole batch of action sequences
+    (rollouts) starting from the same state on the GPU, with one GPU thread per rollout
+    (see tailorshop_cuda.py). This only pays off for large batches
+    (thousands of rollouts) and requires numba with CUDA support.
+    The results match calculate_trajectory up to floating-point rounding.
+    Like calculate_trajectory, this function does not alter the simulation and
+    applies the actions as they are.
+
+    Parameters
+    ----------
+
+    action_seqs : np.ndarray
+        The actions to apply, shape (rollouts, steps, len(ACTION_FIELDS)).
+
+    last_actions: Controllable_Variables
+        The previous actions/state of the controllable variables (that directly led to the state).
+
+    ts_state : Tailorshop_State
+        The state of the non-controllable tailorshop variables to start from.
+
+    Returns
+    -------
+    np.ndarray
+        The states after each of the steps, shape (rollouts, steps, len(STATE_FIELDS)).
+
+    """
+    def calculate_trajectories_cuda(self, action_seqs : np.ndarray,
+                                    last_actions : Controllable_Variables,
+                                    ts_state : Tailorshop_State) -> np.ndarray:
+        action_seqs = np.ascontiguousarray(action_seqs, dtype=np.float64)
+        if action_seqs.ndim != 3 or action_seqs.shape[2] != len(ACTION_FIELDS):
+            raise ValueError("Expected actions of shape (rollouts, steps, {}), got {}.".format(
+                len(ACTION_FIELDS), action_seqs.shape))
+
+        num_rollouts, num_steps, _ = action_seqs.shape
+        if ts_state.turn < 1:
+            raise ValueError("Turns must be at least 1.")
+        remaining_steps = self._max_turn - ts_state.turn
+        if num_steps > remaining_steps:
+            raise Exception("Cannot calculate {} steps, only {} steps remain in the simulation.".format(
+                num_steps, max(remaining_steps, 0)))
+        if num_rollouts == 0 or num_steps == 0:
+            return np.empty((num_rollouts, num_steps, len(STATE_FIELDS)))
+
+        # Imported here, as numba and CUDA are optional
+        from tailorshop_cuda import calculate_trajectories
+        return calculate_trajectories(action_seqs, last_actions.to_array(),
+                                      ts_state.to_array(), self._rnd, self._params)
+
+    """ Applies a whole sequence of actions and advances the simulation 
+    by one step per action (see calculate_trajectory), which is much faster 
+    than calling do_next_step repeatedly. 
+    Note that the actions are applied as they are, i.e., they are neither clamped 
+    nor stepped (as done by the setters of Controllable_Variables).
+
+    Parameters
+    ----------
+
+    action_seq : np.ndarray
+        The actions to apply, one row per step (see ACTION_FIELDS and 
+        Controllable_Variables.to_array).
+
+    Returns
+    -------
+    np.ndarray
+        The states after each of the steps, one row per step (see STATE_FIELDS).
+
+    """
+    def do_next_steps(self, action_seq : np.ndarray) -> np.ndarray:
+        states = self.calculate_trajectory(action_seq, self.last_actions, self.current_state)
+        if len(states) == 0:
+            return states
+
+        # The kernel already rounded everything
+        next_state = Tailorshop_State.from_array(states[-1])
+        # Store the last actions exactly as they were applied by the kernel
+        self.last_actions = Controllable_Variables.from_array(
+            np.asarray(action_seq)[-1], use_steps=self.last_actions.use_steps, normalize=False)
+        self.current_state = next_state
+        return states
+
     """ Returns a copy of the previous actions 
-    (i.e., the actions that directly led to the current state). 
+    (i.e., the actions that directly led to the current state).
+    The copy holds exactly the applied values (see Controllable_Variables.clone).
 
     Returns
     -------
@@ -497,7 +1150,7 @@ class Tailorshop:
 
     """
     def get_last_actions(self) -> Controllable_Variables:
-        return copy(self.last_actions)
+        return self.last_actions.clone()
 
     """ Returns a readable string representing the current state
     of the simulation. 
@@ -509,7 +1162,145 @@ class Tailorshop:
 
     """
     def __str__(self) -> str:
-        text = "Tailorshop Simulation: {}\n".format("finished" if self.is_finished() else "not finished")
-        text += str(self.current_state)
-        text += str(self.last_actions)
-        return text
\ No newline at end of file
+        status = "finished" if self.is_finished() else "not finished"
+        return f"Tailorshop Simulation: {status}\n{self.current_state}{self.last_actions}"
+
+class TailorshopBatch:
+    """ Runs a batch of tailorshop simulations side by side (e.g., for Monte-Carlo
+    rollouts when planning). All simulations start from the current state of a
+    given Tailorshop and share its random variables and parameters.
+    The states and actions are stored field-wise (structure of arrays, see
+    Tailorshop.calculate_step_batch), so all simulations are advanced by a single
+    call of the compiled batch kernel.
+
+    """
+
+    """ Instantiates the batch of simulations.
+
+    Parameters
+    ----------
+    tailorshop : Tailorshop
+        The simulation providing the start state, the previous actions,
+        the random variables and the parameters.
+
+    batch_size : int
+        Number of simulations.
+
+    """
+    def __init__(self, tailorshop : Tailorshop, batch_size : int) -> None:
+        self.tailorshop = tailorshop
+        self.batch_size = batch_size
+        self.initial_states = np.repeat(
+            tailorshop.current_state.to_array()[:, np.newaxis], batch_size, axis=1)
+        self.initial_actions = np.repeat(
+            tailorshop.last_actions.to_array()[:, np.newaxis], batch_size, axis=1)
+        self.reset()
+
+    """ Resets all simulations to the start state.
+
+    """
+    def reset(self) -> None:
+        self.states = self.initial_states.copy()
+        self.last_actions = self.initial_actions.copy()
+
+    """ Checks if the simulations are finished, which is the case
+    once the random variables are depleted. Since all simulations advance together,
+    they are finished at the same time.
+
+    Returns
+    -------
+    bool
+        True, if the simulations are finished.
+
+    """
+    def is_finished(self) -> bool:
+        return self.batch_size == 0 \
+            or self.states[STATE_TURN, 0] >= self.tailorshop._max_turn
+
+    """ Applies given actions and advances all simulations by one step.
+    Note that the actions are applied as they are, i.e., they are neither clamped
+    nor stepped.
+
+    Parameters
+    ----------
+
+    actions: np.ndarray
+        The actions to apply, shape (len(ACTION_FIELDS), batch size),
+        or a single action array (see ACTION_FIELDS) applied to all simulations.
+
+    Returns
+    -------
+    np.ndarray
+        The successor states, shape (len(STATE_FIELDS), batch size).
+
+    """
+    def do_next_step(self, actions : np.ndarray) -> np.ndarray:
+        actions = np.asarray(actions, dtype=np.float64)
+        if actions.ndim == 1:
+            actions = np.repeat(actions[:, np.newaxis], self.batch_size, axis=1)
+        self.states = self.tailorshop.calculate_step_batch(actions, self.last_actions, self.states)
+        self.last_actions = np.array(actions)
+        return self.states
+
+    """ Returns the current states of all simulations, including the derived
+    values for damage and percent_worker_satisfaction.
+
+    Returns
+    -------
+    Tailorshop_StateBatch
+        The current states.
+
+    """
+    def get_states(self) -> Tailorshop_StateBatch:
+        return Tailorshop_StateBatch(self.states)
+
+# Checksum of the positions of the variables, parameters and random variables used 
+# by the kernels. It is compiled into the ahead-of-time compiled kernels (see build_kernel.py),
+# so that a module built for different positions can be detected.
+_KERNEL_LAYOUT_HASH = zlib.crc32(repr(sorted(
+    (name, value) for name, value in globals().items()
+    if name.startswith(("STATE_", "ACTION_", "PARAM_", "RND_", "NUM_PARAMS")) and isinstance(value, int)
+)).encode())
+
+try:
+    # Ahead-of-time compiled kernels (created by build_kernel.py), if available.
+    # A module built by an older version is missing kernels (or was built for 
+    # different positions of the variables) and is therefore ignored.
+    from tailorshop_kernel import (
+        step_kernel as _step_kernel_impl,
+        step_batch_kernel as _step_batch_kernel_impl,
+        trajectory_kernel as _trajectory_kernel_impl,
+        kernel_layout_hash as _aot_kernel_layout_hash
+    )
+    if _aot_kernel_layout_hash() != _KERNEL_LAYOUT_HASH:
+        raise ImportError("tailorshop_kernel does not match tailorshop.py, rebuild it with build_kernel.py")
+except ImportError:
+    try:
+        # Cython kernels (created by build_core.py), if available
+        from tailorshop_core import (
+            step_kernel as _step_kernel_impl,
+            step_batch_kernel as _step_batch_kernel_impl,
+            trajectory_kernel as _trajectory_kernel_impl,
+            PARAM_COUNT as _core_param_count,
+            PARAM_INDICES as _core_param_indices,
+            RND_INDICES as _core_rnd_indices
+        )
+        # The Cython kernels define the positions of the parameters and random
+        # variables themselves, so they must match the ones defined here
+        assert _core_param_count == NUM_PARAMS \
+            and all(globals()[name] == index for name, index in _core_param_indices.items()) \
+            and all(globals()[name] == index for name, index in _core_rnd_indices.items()), \
+            "tailorshop_core does not match tailorshop.py, rebuild it with build_core.py"
+    except ImportError:
+        _step_kernel_impl = _step_kernel
+        _step_batch_kernel_impl = _step_batch_kernel_parallel
+        _trajectory_kernel_impl = _trajectory_kernel
+
+# Compile the step kernel on import (or load it from the cache), 
+# so that the first step does not stall. A failing warm-up must not break the import:
+# the kernel is then compiled (and any error reported) on the first step instead.
+try:
+    _step_kernel_impl(np.zeros(len(ACTION_FIELDS)), np.zeros(len(ACTION_FIELDS)), 
+                      np.ones(len(STATE_FIELDS)), 0.0, 0.0, 0.0, 0.0, np.ones(NUM_PARAMS))
+except Exception:
+    pass
@@ -0,0 +1,253 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+# Cython implementation of the step kernels of tailorshop.py, for deployments
+# without numba. The functions follow the numba kernels operation by operation,
+# so both produce identical results. Build the extension with build_core.py.
+import numpy as np
+cimport numpy as cnp
+from libc.math cimport sqrt, fabs, pow, rint
+from ts_types import (
+    STATE_BANK_ACCOUNT, STATE_SHIRT_SALES, STATE_MATERIAL_PRICE, STATE_SHIRT_STOCK,
+    STATE_WORKER_SATISFACTION, STATE_PRODUCTION_IDLE, STATE_COMPANY_VALUE,
+    STATE_CUSTOMER_INTEREST, STATE_MATERIAL_STOCK, STATE_MACHINE_CAPACITY, STATE_TURN,
+    ACTION_WORKERS50, ACTION_WORKERS100, ACTION_WORKERS_SALARY, ACTION_WORKER_BENEFITS,
+    ACTION_SHIRT_PRICE, ACTION_OUTLETS, ACTION_LOCATION, ACTION_MATERIAL_ORDER,
+    ACTION_MACHINES50, ACTION_MACHINES100, ACTION_MACHINES_MAINTENANCE, ACTION_ADVERTISING
+)
+
+cnp.import_array()
+
+# Positions of the variables (see ts_types)
+cdef Py_ssize_t S_BANK_ACCOUNT = STATE_BANK_ACCOUNT
+cdef Py_ssize_t S_SHIRT_SALES = STATE_SHIRT_SALES
+cdef Py_ssize_t S_MATERIAL_PRICE = STATE_MATERIAL_PRICE
+cdef Py_ssize_t S_SHIRT_STOCK = STATE_SHIRT_STOCK
+cdef Py_ssize_t S_WORKER_SATISFACTION = STATE_WORKER_SATISFACTION
+cdef Py_ssize_t S_PRODUCTION_IDLE = STATE_PRODUCTION_IDLE
+cdef Py_ssize_t S_COMPANY_VALUE = STATE_COMPANY_VALUE
+cdef Py_ssize_t S_CUSTOMER_INTEREST = STATE_CUSTOMER_INTEREST
+cdef Py_ssize_t S_MATERIAL_STOCK = STATE_MATERIAL_STOCK
+cdef Py_ssize_t S_MACHINE_CAPACITY = STATE_MACHINE_CAPACITY
+cdef Py_ssize_t S_TURN = STATE_TURN
+cdef Py_ssize_t A_WORKERS50 = ACTION_WORKERS50
+cdef Py_ssize_t A_WORKERS100 = ACTION_WORKERS100
+cdef Py_ssize_t A_WORKERS_SALARY = ACTION_WORKERS_SALARY
+cdef Py_ssize_t A_WORKER_BENEFITS = ACTION_WORKER_BENEFITS
+cdef Py_ssize_t A_SHIRT_PRICE = ACTION_SHIRT_PRICE
+cdef Py_ssize_t A_OUTLETS = ACTION_OUTLETS
+cdef Py_ssize_t A_LOCATION = ACTION_LOCATION
+cdef Py_ssize_t A_MATERIAL_ORDER = ACTION_MATERIAL_ORDER
+cdef Py_ssize_t A_MACHINES50 = ACTION_MACHINES50
+cdef Py_ssize_t A_MACHINES100 = ACTION_MACHINES100
+cdef Py_ssize_t A_MACHINES_MAINTENANCE = ACTION_MACHINES_MAINTENANCE
+cdef Py_ssize_t A_ADVERTISING = ACTION_ADVERTISING
+
+# Positions of the simulation parameters (must match PARAM_* in tailorshop.py,
+# which cannot be imported here, since tailorshop.py imports this module;
+# tailorshop.py checks them on import, see PARAM_INDICES below)
+cdef enum:
+    P_POSITIVE_INTEREST = 0
+    P_NEGATIVE_INTEREST = 1
+    P_MAX_MACHINE_CAPACITY = 2
+    P_MAX_ADVERTISING_EFFECT = 3
+    P_RENT_SUBURB = 4
+    P_OUTLET_RENT = 7
+    P_PRICE_MACHINE50 = 8
+    P_PRICE_MACHINE100 = 9
+    P_PRICE_OUTLET = 10
+
+# Positions of the random variables (must match RND_* in tailorshop.py)
+cdef enum:
+    R_MACHINES_50 = 0
+    R_MACHINES_100 = 1
+    R_CUSTOMER_INTEREST = 2
+    R_MATERIAL_PRICE = 3
+
+# Exported, so that tailorshop.py can check on import that the positions match
+PARAM_COUNT = P_PRICE_OUTLET + 1
+PARAM_INDICES = {
+    "PARAM_POSITIVE_INTEREST": P_POSITIVE_INTEREST,
+    "PARAM_NEGATIVE_INTEREST": P_NEGATIVE_INTEREST,
+    "PARAM_MAX_MACHINE_CAPACITY": P_MAX_MACHINE_CAPACITY,
+    "PARAM_MAX_ADVERTISING_EFFECT": P_MAX_ADVERTISING_EFFECT,
+    "PARAM_RENT_SUBURB": P_RENT_SUBURB,
+    "PARAM_OUTLET_RENT": P_OUTLET_RENT,
+    "PARAM_PRICE_MACHINE50": P_PRICE_MACHINE50,
+    "PARAM_PRICE_MACHINE100": P_PRICE_MACHINE100,
+    "PARAM_PRICE_OUTLET": P_PRICE_OUTLET
+}
+RND_INDICES = {
+    "RND_MACHINES_50": R_MACHINES_50,
+    "RND_MACHINES_100": R_MACHINES_100,
+    "RND_CUSTOMER_INTEREST": R_CUSTOMER_INTEREST,
+    "RND_MATERIAL_PRICE": R_MATERIAL_PRICE
+}
+
+cdef inline double _min(double a, double b) noexcept nogil:
+    # Same as the builtin min: the first value wins on ties
+    return b if b < a else a
+
+cdef inline double _trade(double number, double buying_price, double selling_price) noexcept nogil:
+    cdef double price = buying_price if number > 0 else selling_price
+    return number * price
+
+cdef void _step(const double[::1] actions, const double[::1] last_actions,
+                const double[::1] ts_state, double rnd_machines_50, double rnd_machines_100,
+                double rnd_customer_interest, double rnd_material_price,
+                const double[::1] params, double[::1] new_state) noexcept nogil:
+    cdef double num_of_machines, maintenance_per_machine, satisfaction, satisfaction_effect
+    cdef double production_capacity, actual_production, production_idle, base_demand
+    cdef double shirts_before_sales, shirt_sales, shirt_price, machine_condition
+    cdef double investments, expenses, num_workers, bank_account, interest, turn
+    cdef double advertising_effect, material_before_production
+
+    material_before_production = ts_state[S_MATERIAL_STOCK] + actions[A_MATERIAL_ORDER]
+
+    # Machine capacity
+    num_of_machines = actions[A_MACHINES50] + actions[A_MACHINES100]
+    maintenance_per_machine = actions[A_MACHINES_MAINTENANCE] / num_of_machines \
+        if num_of_machines > 0 else 0.0
+    new_state[S_MACHINE_CAPACITY] = (0.9 * ts_state[S_MACHINE_CAPACITY]) + (maintenance_per_machine * 0.017)
+
+    # Worker satisfaction
+    satisfaction = (0.5 + ((actions[A_WORKERS_SALARY] - 850) / 550) + (actions[A_WORKER_BENEFITS] / 800))
+    new_state[S_WORKER_SATISFACTION] = satisfaction
+
+    # Production (see _production_capacity)
+    satisfaction_effect = sqrt(fabs(satisfaction))
+    production_capacity = _min(actions[A_MACHINES50], actions[A_WORKERS50]) \
+        * (new_state[S_MACHINE_CAPACITY] + rnd_machines_50) * satisfaction_effect \
+        + _min(actions[A_MACHINES100], actions[A_WORKERS100]) \
+        * ((2 * new_state[S_MACHINE_CAPACITY]) + rnd_machines_100) * satisfaction_effect
+    actual_production = _min(material_before_production, production_capacity)
+
+    production_idle = 0.0
+    if production_capacity != 0:
+        production_idle = (production_capacity - actual_production) / production_capacity
+    new_state[S_PRODUCTION_IDLE] = production_idle
+    new_state[S_MATERIAL_STOCK] = material_before_production - actual_production
+
+    # Shirt sales (see _shirts_demand)
+    shirts_before_sales = ts_state[S_SHIRT_STOCK] + actual_production
+    base_demand = (ts_state[S_CUSTOMER_INTEREST] / 2) + 280
+    shirt_price = actions[A_SHIRT_PRICE]
+    shirt_sales = _min(shirts_before_sales,
+                       base_demand * (1.25 * pow(2.7181, (-1 * (shirt_price * shirt_price) / 4250))))
+    new_state[S_SHIRT_SALES] = shirt_sales
+    new_state[S_SHIRT_STOCK] = shirts_before_sales - shirt_sales
+
+    # Investments (see _investments_machines_outlets)
+    machine_condition = ts_state[S_MACHINE_CAPACITY] / params[P_MAX_MACHINE_CAPACITY]
+    investments = _trade(actions[A_OUTLETS] - last_actions[A_OUTLETS], params[P_PRICE_OUTLET],
+                         0.8 * params[P_PRICE_OUTLET] - (100 * ts_state[S_TURN])) \
+        + _trade(actions[A_MACHINES50] - last_actions[A_MACHINES50], params[P_PRICE_MACHINE50],
+                 0.8 * params[P_PRICE_MACHINE50] * machine_condition) \
+        + _trade(actions[A_MACHINES100] - last_actions[A_MACHINES100], params[P_PRICE_MACHINE100],
+                 0.8 * params[P_PRICE_MACHINE100] * machine_condition)
+
+    # Regular expenses (see _regular_expenses)
+    num_workers = actions[A_WORKERS50] + actions[A_WORKERS100]
+    expenses = actions[A_MATERIAL_ORDER] * ts_state[S_MATERIAL_PRICE] \
+        + actions[A_WORKERS_SALARY] * num_workers + actions[A_WORKER_BENEFITS] * num_workers \
+        + actions[A_ADVERTISING] \
+        + actions[A_OUTLETS] * params[P_OUTLET_RENT] \
+        + params[P_RENT_SUBURB + <Py_ssize_t>actions[A_LOCATION]] \
+        + actions[A_MACHINES_MAINTENANCE] \
+        + (ts_state[S_SHIRT_STOCK] + (0.5 * ts_state[S_MATERIAL_STOCK]))
+
+    # Interest
+    bank_account = ts_state[S_BANK_ACCOUNT]
+    interest = bank_account * (params[P_POSITIVE_INTEREST] if bank_account > 0
+                               else params[P_NEGATIVE_INTEREST])
+    new_state[S_BANK_ACCOUNT] = bank_account + interest + shirt_sales * actions[A_SHIRT_PRICE] \
+        - investments - expenses
+
+    # Customer interest (see _customer_interest)
+    advertising_effect = _min((actions[A_ADVERTISING] / 5), params[P_MAX_ADVERTISING_EFFECT])
+    new_state[S_CUSTOMER_INTEREST] = ((advertising_effect + 100 * actions[A_OUTLETS])
+                                      * (1 + (actions[A_LOCATION] / 10))) + rnd_customer_interest
+
+    new_state[S_MATERIAL_PRICE] = rint(rnd_material_price)
+    new_state[S_TURN] = ts_state[S_TURN] + 1
+
+    # Company value (see _company_value)
+    turn = new_state[S_TURN]
+    machine_condition = new_state[S_MACHINE_CAPACITY] / params[P_MAX_MACHINE_CAPACITY]
+    new_state[S_COMPANY_VALUE] = new_state[S_BANK_ACCOUNT] \
+        + actions[A_MACHINES50] * (machine_condition * params[P_PRICE_MACHINE50]) \
+        + actions[A_MACHINES100] * (machine_condition * params[P_PRICE_MACHINE100]) \
+        + (actions[A_OUTLETS] * params[P_PRICE_OUTLET] - (turn * 100)) \
+        + new_state[S_MATERIAL_STOCK] * 2 \
+        + new_state[S_SHIRT_STOCK] * 20
+
+    # Rounding (see _round_state), adding 0.0 turns a negative zero into zero
+    new_state[S_BANK_ACCOUNT] = rint(new_state[S_BANK_ACCOUNT]) + 0.0
+    new_state[S_SHIRT_SALES] = rint(new_state[S_SHIRT_SALES]) + 0.0
+    new_state[S_MATERIAL_PRICE] = rint(new_state[S_MATERIAL_PRICE]) + 0.0
+    new_state[S_SHIRT_STOCK] = rint(new_state[S_SHIRT_STOCK]) + 0.0
+    new_state[S_COMPANY_VALUE] = rint(new_state[S_COMPANY_VALUE]) + 0.0
+    new_state[S_CUSTOMER_INTEREST] = rint(new_state[S_CUSTOMER_INTEREST]) + 0.0
+    new_state[S_MATERIAL_STOCK] = rint(new_state[S_MATERIAL_STOCK]) + 0.0
+    new_state[S_MACHINE_CAPACITY] = rint(new_state[S_MACHINE_CAPACITY]) + 0.0
+
+def step_kernel(const double[::1] actions, const double[::1] last_actions,
+                const double[::1] ts_state, double rnd_machines_50, double rnd_machines_100,
+                double rnd_customer_interest, double rnd_material_price,
+                const double[::1] params):
+    """ See tailorshop._step_kernel. """
+    new_state = np.empty(ts_state.shape[0], dtype=np.float64)
+    cdef double[::1] new_view = new_state
+    with nogil:
+        _step(actions, last_actions, ts_state, rnd_machines_50, rnd_machines_100,
+              rnd_customer_interest, rnd_material_price, params, new_view)
+    return new_state
+
+def step_batch_kernel(actions, last_actions, ts_states, const double[:, ::1] rnd,
+                      const double[::1] params):
+    """ See tailorshop._step_batch_kernel. """
+    # The loop below does not check bounds, so the turns are validated here
+    turns = np.asarray(ts_states)[S_TURN]
+    if turns.size > 0 and (turns.min() < 1 or turns.max() > rnd.shape[1]):
+        raise ValueError("Turns must be between 1 and {}.".format(rnd.shape[1]))
+    # Work on the members of the batch as contiguous rows
+    cdef double[:, ::1] actions_t = np.ascontiguousarray(np.asarray(actions).T)
+    cdef double[:, ::1] last_actions_t = np.ascontiguousarray(np.asarray(last_actions).T)
+    cdef double[:, ::1] states_t = np.ascontiguousarray(np.asarray(ts_states).T)
+    new_states_t = np.empty((states_t.shape[0], states_t.shape[1]), dtype=np.float64)
+    cdef double[:, ::1] new_view = new_states_t
+    cdef Py_ssize_t i, rnd_idx
+    with nogil:
+        for i in range(states_t.shape[0]):
+            rnd_idx = <Py_ssize_t>states_t[i, S_TURN] - 1
+            _step(actions_t[i], last_actions_t[i], states_t[i],
+                  rnd[R_MACHINES_50, rnd_idx], rnd[R_MACHINES_100, rnd_idx],
+                  rnd[R_CUSTOMER_INTEREST, rnd_idx], rnd[R_MATERIAL_PRICE, rnd_idx],
+                  params, new_view[i])
+    return np.ascontiguousarray(new_states_t.T)
+
+def trajectory_kernel(const double[:, ::1] action_seq, const double[::1] last_actions,
+                      const double[::1] ts_state, const double[:, ::1] rnd,
+                      const double[::1] params):
+    """ See tailorshop._trajectory_kernel. """
+    # The loop below does not check bounds, so the turns are validated here
+    # (the turn advances by one per step)
+    if action_seq.shape[0] > 0 and (ts_state[S_TURN] < 1
+                                    or ts_state[S_TURN] - 1 + action_seq.shape[0] > rnd.shape[1]):
+        raise ValueError("Turns must be between 1 and {}.".format(rnd.shape[1]))
+    out_states = np.empty((action_seq.shape[0], ts_state.shape[0]), dtype=np.float64)
+    cdef double[:, ::1] out_view = out_states
+    cdef Py_ssize_t t, rnd_idx
+    with nogil:
+        for t in range(action_seq.shape[0]):
+            if t == 0:
+                rnd_idx = <Py_ssize_t>ts_state[S_TURN] - 1
+                _step(action_seq[t], last_actions, ts_state,
+                      rnd[R_MACHINES_50, rnd_idx], rnd[R_MACHINES_100, rnd_idx],
+                      rnd[R_CUSTOMER_INTEREST, rnd_idx], rnd[R_MATERIAL_PRICE, rnd_idx],
+                      params, out_view[t])
+            else:
+                rnd_idx = <Py_ssize_t>out_view[t - 1, S_TURN] - 1
+                _step(action_seq[t], action_seq[t - 1], out_view[t - 1],
+                      rnd[R_MACHINES_50, rnd_idx], rnd[R_MACHINES_100, rnd_idx],
+                      rnd[R_CUSTOMER_INTEREST, rnd_idx], rnd[R_MATERIAL_PRICE, rnd_idx],
+                      params, out_view[t])
+    return out_states
@@ -0,0 +1,251 @@
+# CUDA implementation of the trajectory kernel for large batches of rollouts
+# (requires numba with CUDA support and a CUDA-capable GPU).
+# Every GPU thread simulates one rollout. The device functions follow the kernels
+# of tailorshop.py operation by operation, so the results match up to floating-point
+# rounding (the GPU compiler contracts multiply-adds into FMAs and pow comes from 
+# libdevice), which can occasionally change a rounded state variable.
+# Use it via Tailorshop.calculate_trajectories_cuda.
+from ts_types import (
+    STATE_BANK_ACCOUNT, STATE_SHIRT_SALES, STATE_MATERIAL_PRICE, STATE_SHIRT_STOCK,
+    STATE_WORKER_SATISFACTION, STATE_PRODUCTION_IDLE, STATE_COMPANY_VALUE,
+    STATE_CUSTOMER_INTEREST, STATE_MATERIAL_STOCK, STATE_MACHINE_CAPACITY, STATE_TURN,
+    ACTION_WORKERS50, ACTION_WORKERS100, ACTION_WORKERS_SALARY, ACTION_WORKER_BENEFITS,
+    ACTION_SHIRT_PRICE, ACTION_OUTLETS, ACTION_LOCATION, ACTION_MATERIAL_ORDER,
+    ACTION_MACHINES50, ACTION_MACHINES100, ACTION_MACHINES_MAINTENANCE, ACTION_ADVERTISING
+)
+from tailorshop import (
+    PARAM_POSITIVE_INTEREST, PARAM_NEGATIVE_INTEREST, PARAM_MAX_MACHINE_CAPACITY,
+    PARAM_MAX_ADVERTISING_EFFECT, PARAM_RENT_SUBURB, PARAM_OUTLET_RENT,
+    PARAM_PRICE_MACHINE50, PARAM_PRICE_MACHINE100, PARAM_PRICE_OUTLET,
+    RND_MACHINES_50, RND_MACHINES_100, RND_CUSTOMER_INTEREST, RND_MATERIAL_PRICE
+)
+from numba import cuda
+import numpy as np
+import math
+
+# Number of threads per block used for launching the kernel
+THREADS_PER_BLOCK = 128
+
+""" Rounds half to even, like np.rint (which is not available on the device).
+    Negative zeros are turned into zero.
+
+    Parameters
+    ----------
+
+    value : float
+        Value to round.
+
+    Returns
+    -------
+    float
+        Rounded value.
+
+    """
+@cuda.jit(device=True)
+def _round_half_even(value : float) -> float:
+    rounded = math.floor(value)
+    fraction = value - rounded
+    if fraction > 0.5 or (fraction == 0.5 and rounded % 2 != 0):
+        rounded += 1.0
+    return rounded + 0.0
+
+""" Helper function for buying/selling assets (see tailorshop._trade).
+
+    """
+@cuda.jit(device=True)
+def _trade(number : float, buying_price : float, selling_price : float) -> float:
+    price = buying_price if number > 0 else selling_price
+    return number * price
+
+""" Calculates the (rounded) successor state (see tailorshop._step_kernel),
+    writing it into a given array instead of allocating one.
+
+    Parameters
+    ----------
+
+    actions: array
+        The actions/state of the controllable variables that should be applied (see ACTION_FIELDS).
+
+    last_actions: array
+        The previous actions/state of the controllable variables (see ACTION_FIELDS).
+
+    ts_state : array
+        The state of the non-controllable tailorshop variables (see STATE_FIELDS).
+
+    rnd : array
+        The random variables, one row per kind of variable (see RND_*)
+        and one column per turn.
+
+    params : array
+        The simulation parameters (see Tailorshop._parameters_array).
+
+    new_state : array
+        Array to write the successor state to (see STATE_FIELDS).
+
+    """
+@cuda.jit(device=True)
+def _step(actions, last_actions, ts_state, rnd, params, new_state) -> None:
+    rnd_idx = int(ts_state[STATE_TURN]) - 1
+
+    material_before_production = ts_state[STATE_MATERIAL_STOCK] + actions[ACTION_MATERIAL_ORDER]
+
+    # Machine capacity
+    num_of_machines = actions[ACTION_MACHINES50] + actions[ACTION_MACHINES100]
+    maintenance_per_machine = actions[ACTION_MACHINES_MAINTENANCE] / num_of_machines \
+        if num_of_machines > 0 else 0.0
+    machine_capacity = (0.9 * ts_state[STATE_MACHINE_CAPACITY]) + (maintenance_per_machine * 0.017)
+    new_state[STATE_MACHINE_CAPACITY] = machine_capacity
+
+    # Worker satisfaction
+    satisfaction = (0.5 + ((actions[ACTION_WORKERS_SALARY] - 850) / 550) + (actions[ACTION_WORKER_BENEFITS] / 800))
+    new_state[STATE_WORKER_SATISFACTION] = satisfaction
+
+    # Production (see tailorshop._production_capacity)
+    satisfaction_effect = math.sqrt(abs(satisfaction))
+    production_capacity = min(actions[ACTION_MACHINES50], actions[ACTION_WORKERS50]) \
+        * (machine_capacity + rnd[RND_MACHINES_50, rnd_idx]) * satisfaction_effect \
+        + min(actions[ACTION_MACHINES100], actions[ACTION_WORKERS100]) \
+        * ((2 * machine_capacity) + rnd[RND_MACHINES_100, rnd_idx]) * satisfaction_effect
+    actual_production = min(material_before_production, production_capacity)
+
+    production_idle = 0.0
+    if production_capacity != 0:
+        production_idle = (production_capacity - actual_production) / production_capacity
+    new_state[STATE_PRODUCTION_IDLE] = production_idle
+    material_stock = material_before_production - actual_production
+
+    # Shirt sales (see tailorshop._shirts_demand)
+    shirts_before_sales = ts_state[STATE_SHIRT_STOCK] + actual_production
+    base_demand = (ts_state[STATE_CUSTOMER_INTEREST] / 2) + 280
+    shirt_price = actions[ACTION_SHIRT_PRICE]
+    shirt_sales = min(shirts_before_sales,
+                      base_demand * (1.25 * math.pow(2.7181, (-1 * (shirt_price * shirt_price) / 4250))))
+    shirt_stock = shirts_before_sales - shirt_sales
+
+    # Investments (see tailorshop._investments_machines_outlets)
+    machine_condition = ts_state[STATE_MACHINE_CAPACITY] / params[PARAM_MAX_MACHINE_CAPACITY]
+    investments = _trade(actions[ACTION_OUTLETS] - last_actions[ACTION_OUTLETS],
+                         params[PARAM_PRICE_OUTLET],
+                         0.8 * params[PARAM_PRICE_OUTLET] - (100 * ts_state[STATE_TURN])) \
+        + _trade(actions[ACTION_MACHINES50] - last_actions[ACTION_MACHINES50],
+                 params[PARAM_PRICE_MACHINE50],
+                 0.8 * params[PARAM_PRICE_MACHINE50] * machine_condition) \
+        + _trade(actions[ACTION_MACHINES100] - last_actions[ACTION_MACHINES100],
+                 params[PARAM_PRICE_MACHINE100],
+                 0.8 * params[PARAM_PRICE_MACHINE100] * machine_condition)
+
+    # Regular expenses (see tailorshop._regular_expenses)
+    num_workers = actions[ACTION_WORKERS50] + actions[ACTION_WORKERS100]
+    expenses = actions[ACTION_MATERIAL_ORDER] * ts_state[STATE_MATERIAL_PRICE] \
+        + actions[ACTION_WORKERS_SALARY] * num_workers + actions[ACTION_WORKER_BENEFITS] * num_workers \
+        + actions[ACTION_ADVERTISING] \
+        + actions[ACTION_OUTLETS] * params[PARAM_OUTLET_RENT] \
+        + params[PARAM_RENT_SUBURB + int(actions[ACTION_LOCATION])] \
+        + actions[ACTION_MACHINES_MAINTENANCE] \
+        + (ts_state[STATE_SHIRT_STOCK] + (0.5 * ts_state[STATE_MATERIAL_STOCK]))
+
+    # Interest
+    bank_account = ts_state[STATE_BANK_ACCOUNT]
+    interest_rate = params[PARAM_POSITIVE_INTEREST] if bank_account > 0 else params[PARAM_NEGATIVE_INTEREST]
+    bank_account = bank_account + (bank_account * interest_rate) \
+        + shirt_sales * actions[ACTION_SHIRT_PRICE] - investments - expenses
+
+    # Customer interest (see tailorshop._customer_interest)
+    advertising_effect = min((actions[ACTION_ADVERTISING] / 5), params[PARAM_MAX_ADVERTISING_EFFECT])
+    customer_interest = ((advertising_effect + 100 * actions[ACTION_OUTLETS])
+                         * (1 + (actions[ACTION_LOCATION] / 10))) + rnd[RND_CUSTOMER_INTEREST, rnd_idx]
+
+    turn = ts_state[STATE_TURN] + 1
+
+    # Company value (see tailorshop._company_value)
+    machine_condition = machine_capacity / params[PARAM_MAX_MACHINE_CAPACITY]
+    company_value = bank_account \
+        + actions[ACTION_MACHINES50] * (machine_condition * params[PARAM_PRICE_MACHINE50]) \
+        + actions[ACTION_MACHINES100] * (machine_condition * params[PARAM_PRICE_MACHINE100]) \
+        + (actions[ACTION_OUTLETS] * params[PARAM_PRICE_OUTLET] - (turn * 100)) \
+        + material_stock * 2 \
+        + shirt_stock * 20
+
+    # Rounding (see tailorshop._round_state)
+    new_state[STATE_BANK_ACCOUNT] = _round_half_even(bank_account)
+    new_state[STATE_SHIRT_SALES] = _round_half_even(shirt_sales)
+    new_state[STATE_MATERIAL_PRICE] = _round_half_even(rnd[RND_MATERIAL_PRICE, rnd_idx])
+    new_state[STATE_SHIRT_STOCK] = _round_half_even(shirt_stock)
+    new_state[STATE_COMPANY_VALUE] = _round_half_even(company_value)
+    new_state[STATE_CUSTOMER_INTEREST] = _round_half_even(customer_interest)
+    new_state[STATE_MATERIAL_STOCK] = _round_half_even(material_stock)
+    new_state[STATE_MACHINE_CAPACITY] = _round_half_even(machine_capacity)
+    new_state[STATE_TURN] = turn
+
+""" Calculates the trajectories of a batch of rollouts, one rollout per thread.
+
+    Parameters
+    ----------
+
+    action_seqs : array
+        The actions to apply, shape (rollouts, steps, len(ACTION_FIELDS)).
+
+    last_actions : array
+        The actions that directly led to the start state (see ACTION_FIELDS).
+
+    ts_state : array
+        The start state of the non-controllable tailorshop variables (see STATE_FIELDS).
+
+    rnd : array
+        The random variables, one row per kind of variable (see RND_*)
+        and one column per turn.
+
+    params : array
+        The simulation parameters (see Tailorshop._parameters_array).
+
+    out_states : array
+        Array to write the states to, shape (rollouts, steps, len(STATE_FIELDS)).
+
+    """
+@cuda.jit
+def _trajectories_kernel(action_seqs, last_actions, ts_state, rnd, params, out_states) -> None:
+    rollout = cuda.grid(1)
+    if rollout >= action_seqs.shape[0]:
+        return
+    _step(action_seqs[rollout, 0], last_actions, ts_state, rnd, params, out_states[rollout, 0])
+    for t in range(1, action_seqs.shape[1]):
+        _step(action_seqs[rollout, t], action_seqs[rollout, t - 1], out_states[rollout, t - 1],
+              rnd, params, out_states[rollout, t])
+
+""" Calculates the trajectories of a batch of rollouts on the GPU.
+
+    Parameters
+    ----------
+
+    action_seqs : np.ndarray
+        The actions to apply, shape (rollouts, steps, len(ACTION_FIELDS)).
+
+    last_actions : np.ndarray
+        The actions that directly led to the start state (see ACTION_FIELDS).
+
+    ts_state : np.ndarray
+        The start state of the non-controllable tailorshop variables (see STATE_FIELDS).
+
+    rnd : np.ndarray
+        The random variables, one row per kind of variable (see RND_*)
+        and one column per turn.
+
+    params : np.ndarray
+        The simulation parameters (see Tailorshop._parameters_array).
+
+    Returns
+    -------
+    np.ndarray
+        The states after each of the steps, shape (rollouts, steps, len(STATE_FIELDS)).
+
+    """
+def calculate_trajectories(action_seqs : np.ndarray, last_actions : np.ndarray,
+                           ts_state : np.ndarray, rnd : np.ndarray,
+                           params : np.ndarray) -> np.ndarray:
+    num_rollouts, num_steps, _ = action_seqs.shape
+    out_states = cuda.device_array((num_rollouts, num_steps, ts_state.shape[0]), dtype=np.float64)
+    num_blocks = (num_rollouts + THREADS_PER_BLOCK - 1) // THREADS_PER_BLOCK
+    _trajectories_kernel[num_blocks, THREADS_PER_BLOCK](
+        cuda.to_device(action_seqs), cuda.to_device(last_actions), cuda.to_device(ts_state),
+        cuda.to_device(rnd), cuda.to_device(params), out_states)
+    return out_states.copy_to_host()
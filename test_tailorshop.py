@@ -0,0 +1,294 @@
+# Tests of the simulation kernels against a plain Python reference implementation
+# (following the original object-based implementation of Tailorshop.calculate_step).
+# Run with "python -m pytest" or "python -m unittest" from this directory.
+import unittest
+import numpy as np
+from tailorshop import Tailorshop, TailorshopBatch
+from ts_types import (
+    Tailorshop_State, Controllable_Variables, STATE_FIELDS, STATE_TURN, ACTION_SHIRT_PRICE
+)
+
+# Names of the random variables of a simulation
+rnd_names = ("rnd_machines_50", "rnd_machines_100", "rnd_customer_interest", "rnd_material_price")
+
+""" Calculates the successor state in plain Python, without any of the kernels.
+
+    Parameters
+    ----------
+
+    ts : Tailorshop
+        The simulation providing the random variables and parameters.
+
+    actions: Controllable_Variables
+        The actions that should be applied to the state.
+
+    last_actions: Controllable_Variables
+        The previous actions (that directly led to the state).
+
+    ts_state : Tailorshop_State
+        The state of the non-controllable tailorshop variables.
+
+    Returns
+    -------
+    dict
+        The variables of the successor state (see STATE_FIELDS).
+
+    """
+def reference_step(ts : Tailorshop, actions : Controllable_Variables,
+                   last_actions : Controllable_Variables, ts_state : Tailorshop_State) -> dict:
+    turn = ts_state.turn
+    rnd_machines_50, rnd_machines_100, rnd_customer_interest, rnd_material_price = \
+        (float(getattr(ts, name)[turn - 1]) for name in rnd_names)
+    trade = lambda number, buying, selling: number * (buying if number > 0 else selling)
+
+    material_before_production = ts_state.material_stock + actions.material_order
+    num_of_machines = actions.machines50 + actions.machines100
+    maintenance_per_machine = actions.machines_maintenance / num_of_machines \
+        if num_of_machines > 0 else 0.0
+    machine_capacity = (0.9 * ts_state.machine_capacity) + (maintenance_per_machine * 0.017)
+    satisfaction = (0.5 + ((actions.workers_salary - 850) / 550) + (actions.worker_benefits / 800))
+
+    # Production (with the new machine capacity and worker satisfaction)
+    satisfaction_effect = np.sqrt(np.abs(satisfaction))
+    capacity_50 = min(actions.machines50, actions.workers50) \
+        * (machine_capacity + rnd_machines_50) * satisfaction_effect
+    capacity_100 = min(actions.machines100, actions.workers100) \
+        * ((2 * machine_capacity) + rnd_machines_100) * satisfaction_effect
+    production_capacity = capacity_50 + capacity_100
+    actual_production = min(material_before_production, production_capacity)
+    production_idle = 0
+    if production_capacity != 0:
+        production_idle = (production_capacity - actual_production) / production_capacity
+
+    # Sales
+    shirts_before_sales = ts_state.shirt_stock + actual_production
+    demand = ((ts_state.customer_interest / 2) + 280) \
+        * (1.25 * np.power(2.7181, (-1 * (np.power(actions.shirt_price, 2)) / 4250)))
+    shirt_sales = min(shirts_before_sales, demand)
+
+    # Investments and expenses
+    machine_condition = ts_state.machine_capacity / ts.max_machine_capacity
+    investments = trade(actions.outlets - last_actions.outlets, ts.price_outlet,
+                        0.8 * ts.price_outlet - (100 * turn)) \
+        + trade(actions.machines50 - last_actions.machines50, ts.price_machine50,
+                0.8 * ts.price_machine50 * machine_condition) \
+        + trade(actions.machines100 - last_actions.machines100, ts.price_machine100,
+                0.8 * ts.price_machine100 * machine_condition)
+    num_workers = actions.workers50 + actions.workers100
+    expenses = actions.material_order * ts_state.material_price \
+        + actions.workers_salary * num_workers + actions.worker_benefits * num_workers \
+        + actions.advertising + actions.outlets * ts.outlet_rent \
+        + ts.locations_rents[actions.location] + actions.machines_maintenance \
+        + ts_state.shirt_stock + (0.5 * ts_state.material_stock)
+
+    bank = ts_state.bank_account
+    interest = bank * (ts.positive_interest if bank > 0 else ts.negative_interest)
+    bank_account = bank + interest + shirt_sales * actions.shirt_price - investments - expenses
+
+    customer_interest = ((min((actions.advertising / 5), ts.max_advertising_effect)
+                          + 100 * actions.outlets) * (1 + (actions.location / 10))) \
+        + rnd_customer_interest
+
+    # Company value (with the new state)
+    material_stock = material_before_production - actual_production
+    shirt_stock = shirts_before_sales - shirt_sales
+    company_value = bank_account \
+        + actions.machines50 * (machine_capacity / ts.max_machine_capacity * ts.price_machine50) \
+        + actions.machines100 * (machine_capacity / ts.max_machine_capacity * ts.price_machine100) \
+        + (actions.outlets * ts.price_outlet - ((turn + 1) * 100)) \
+        + material_stock * 2 + shirt_stock * 20
+
+    return {
+        "bank_account": round(bank_account),
+        "shirt_sales": round(shirt_sales),
+        "material_price": round(rnd_material_price),
+        "shirt_stock": round(shirt_stock),
+        "worker_satisfaction": satisfaction,
+        "production_idle": production_idle,
+        "company_value": round(company_value),
+        "customer_interest": round(customer_interest),
+        "material_stock": round(material_stock),
+        "machine_capacity": round(machine_capacity),
+        "turn": turn + 1
+    }
+
+""" Draws random (valid) actions through the setters of Controllable_Variables.
+
+    Parameters
+    ----------
+
+    rng : np.random.Generator
+        The source of randomness.
+
+    Returns
+    -------
+    Controllable_Variables
+        The actions.
+
+    """
+def random_actions(rng : np.random.Generator) -> Controllable_Variables:
+    actions = Controllable_Variables()
+    actions.set_workers50(int(rng.integers(0, 20)))
+    actions.set_workers100(int(rng.integers(0, 20)))
+    actions.set_workers_salary(int(rng.integers(500, 3000)))
+    actions.set_worker_benefits(int(rng.integers(0, 500)))
+    actions.set_shirt_price(int(rng.integers(10, 100)))
+    actions.set_outlets(int(rng.integers(0, 10)))
+    actions.set_location(int(rng.integers(0, 3)))
+    actions.set_material_order(int(rng.integers(0, 5000)))
+    actions.set_machines50(int(rng.integers(0, 20)))
+    actions.set_machines100(int(rng.integers(0, 20)))
+    actions.set_machines_maintenance(int(rng.integers(0, 5000)))
+    actions.set_advertising(int(rng.integers(0, 10000)))
+    return actions
+
+class TestStep(unittest.TestCase):
+
+    def assert_step_matches_reference(self, ts : Tailorshop, actions : Controllable_Variables) -> None:
+        expected = reference_step(ts, actions, ts.last_actions, ts.current_state)
+        ts.do_next_step(actions)
+        for name, value in expected.items():
+            self.assertEqual(getattr(ts.current_state, name), value, name)
+
+    def test_matches_reference(self):
+        rng = np.random.default_rng(1)
+        for randomize in (False, True):
+            ts = Tailorshop(randomize=randomize, rng=rng)
+            while not ts.is_finished():
+                self.assert_step_matches_reference(ts, random_actions(rng))
+
+    def test_maintenance_without_machines(self):
+        ts = Tailorshop()
+        actions = ts.get_last_actions()
+        actions.set_machines50(0)
+        actions.set_machines100(0)
+        actions.set_machines_maintenance(1000)
+        self.assert_step_matches_reference(ts, actions)
+        # Nothing to maintain, so the capacity only decays
+        self.assertEqual(ts.current_state.machine_capacity, round(0.9 * ts.initial_state.machine_capacity))
+
+    def test_material_limited_production(self):
+        ts = Tailorshop(ts_state=Tailorshop_State(material_stock=10))
+        actions = ts.get_last_actions()
+        actions.set_material_order(0)
+        self.assert_step_matches_reference(ts, actions)
+        self.assertGreater(ts.current_state.production_idle, 0)
+        self.assertLess(ts.current_state.production_idle, 1)
+
+    def test_parameters_assigned_on_instance(self):
+        ts = Tailorshop()
+        ts.positive_interest = 0.5
+        expected = reference_step(ts, ts.last_actions, ts.last_actions, ts.current_state)
+        ts.do_next_step(ts.get_last_actions())
+        self.assertEqual(ts.current_state.bank_account, expected["bank_account"])
+
+    def test_rnd_sequences_of_different_length(self):
+        ts = Tailorshop()
+        ts.rnd_machines_50 = [0.0] * 3
+        self.assertEqual(len(ts.rnd_machines_50), 3)
+        steps = 0
+        while not ts.is_finished():
+            ts.do_next_step(ts.get_last_actions())
+            steps += 1
+        self.assertEqual(steps, 2)
+
+    def test_turn_below_one(self):
+        ts = Tailorshop()
+        ts.rnd_machines_50 = [1.0] * 3
+        ts_state = ts.current_state.clone()
+        ts_state.turn = 0
+        with self.assertRaises(ValueError):
+            ts.calculate_step(ts.last_actions, ts.last_actions, ts_state)
+
+class TestTrajectoriesAndBatches(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(2)
+        self.ts = Tailorshop(randomize=True, rng=self.rng)
+        self.action_seq = [random_actions(self.rng) for _ in range(len(self.ts.rnd_material_price) - 1)]
+
+    def stepped_states(self) -> np.ndarray:
+        ts = Tailorshop(ts_state=self.ts.current_state, initial_actions=self.ts.last_actions)
+        for name in rnd_names:
+            setattr(ts, name, getattr(self.ts, name))
+        states = []
+        for actions in self.action_seq:
+            ts.do_next_step(actions)
+            states.append(ts.current_state.to_array())
+        return np.array(states)
+
+    def test_trajectory(self):
+        states = self.ts.calculate_trajectory(
+            np.array([actions.to_array() for actions in self.action_seq]),
+            self.ts.last_actions, self.ts.current_state)
+        np.testing.assert_array_equal(states, self.stepped_states())
+
+    def test_step_batch(self):
+        expected = self.stepped_states()
+        previous_states = np.vstack((self.ts.current_state.to_array(), expected[:-1]))
+        previous_actions = [self.ts.last_actions] + self.action_seq[:-1]
+        states = self.ts.calculate_step_batch(
+            np.array([actions.to_array() for actions in self.action_seq]).T,
+            np.array([actions.to_array() for actions in previous_actions]).T,
+            previous_states.T)
+        np.testing.assert_array_equal(states.T, expected)
+
+    def test_tailorshop_batch(self):
+        expected = self.stepped_states()
+        batch = TailorshopBatch(self.ts, 3)
+        for t, actions in enumerate(self.action_seq):
+            batch.do_next_step(actions.to_array())
+            for i in range(3):
+                np.testing.assert_array_equal(batch.states[:, i], expected[t])
+        self.assertTrue(batch.is_finished())
+
+    def test_turn_below_one(self):
+        states = self.ts.current_state.to_array()[:, np.newaxis].copy()
+        states[STATE_TURN] = 0
+        actions = self.ts.last_actions.to_array()[:, np.newaxis]
+        with self.assertRaises(ValueError):
+            self.ts.calculate_step_batch(actions, actions, states)
+
+class TestSimulationState(unittest.TestCase):
+
+    def test_reset(self):
+        ts = Tailorshop()
+        ts.do_next_step(ts.get_last_actions())
+        state_before_reset = ts.current_state
+        ts.reset()
+        self.assertEqual(state_before_reset.turn, 2)
+        self.assertEqual(ts.current_state.turn, 1)
+        np.testing.assert_array_equal(ts.current_state.to_array(), ts.initial_state.to_array())
+        np.testing.assert_array_equal(ts.get_last_actions().to_array(), ts.initial_actions.to_array())
+
+    def test_do_next_steps(self):
+        rng = np.random.default_rng(3)
+        action_seq = [random_actions(rng) for _ in range(5)]
+        stepped = Tailorshop()
+        for actions in action_seq:
+            stepped.do_next_step(actions)
+
+        ts = Tailorshop()
+        states = ts.do_next_steps(np.array([actions.to_array() for actions in action_seq]))
+        self.assertEqual(states.shape, (5, len(STATE_FIELDS)))
+        np.testing.assert_array_equal(ts.current_state.to_array(), stepped.current_state.to_array())
+        np.testing.assert_array_equal(ts.get_last_actions().to_array(),
+                                      stepped.get_last_actions().to_array())
+
+    def test_do_next_steps_keeps_applied_actions(self):
+        ts = Tailorshop()
+        action_seq = ts.last_actions.to_array()[np.newaxis, :].copy()
+        action_seq[0, ACTION_SHIRT_PRICE] = 53.5 # Not a valid shirt price for the setters
+        ts.do_next_steps(action_seq)
+        np.testing.assert_array_equal(ts.get_last_actions().to_array(), action_seq[0])
+
+    def test_last_actions_are_copies(self):
+        ts = Tailorshop()
+        actions = ts.get_last_actions()
+        actions.set_workers50(actions.workers50 + 1)
+        ts.do_next_step(actions)
+        actions.set_workers50(actions.workers50 + 1)
+        self.assertEqual(ts.get_last_actions().workers50, actions.workers50 - 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,57 @@
 from __future__ import annotations
-from typing import Union
+from typing import Callable, Union
+import numpy as np
+
+# Positions of the variables in the array representations of 
+# Tailorshop_State and Controllable_Variables (used by the step kernel).
+STATE_BANK_ACCOUNT = 0
+STATE_SHIRT_SALES = 1
+STATE_MATERIAL_PRICE = 2
+STATE_SHIRT_STOCK = 3
+STATE_WORKER_SATISFACTION = 4
+STATE_PRODUCTION_IDLE = 5
+STATE_COMPANY_VALUE = 6
+STATE_CUSTOMER_INTEREST = 7
+STATE_MATERIAL_STOCK = 8
+STATE_MACHINE_CAPACITY = 9
+STATE_TURN = 10
+STATE_FIELDS = (
+    "bank_account", "shirt_sales", "material_price", "shirt_stock",
+    "worker_satisfaction", "production_idle", "company_value",
+    "customer_interest", "material_stock", "machine_capacity", "turn"
+)
+
+# Positions of the variables that are rounded after each step
+# (see Tailorshop_State.round_and_update)
+STATE_ROUNDED_INDICES = np.array([
+    STATE_BANK_ACCOUNT, STATE_SHIRT_SALES, STATE_MATERIAL_PRICE, STATE_SHIRT_STOCK,
+    STATE_COMPANY_VALUE, STATE_CUSTOMER_INTEREST, STATE_MATERIAL_STOCK, STATE_MACHINE_CAPACITY
+])
+
+ACTION_WORKERS50 = 0
+ACTION_WORKERS100 = 1
+ACTION_WORKERS_SALARY = 2
+ACTION_WORKER_BENEFITS = 3
+ACTION_SHIRT_PRICE = 4
+ACTION_OUTLETS = 5
+ACTION_LOCATION = 6
+ACTION_MATERIAL_ORDER = 7
+ACTION_MACHINES50 = 8
+ACTION_MACHINES100 = 9
+ACTION_MACHINES_MAINTENANCE = 10
+ACTION_ADVERTISING = 11
+ACTION_FIELDS = (
+    "workers50", "workers100", "workers_salary", "worker_benefits",
+    "shirt_price", "outlets", "location", "material_order",
+    "machines50", "machines100", "machines_maintenance", "advertising"
+)
+
+# Limits and stepsizes of the controllable variables (ordered as in ACTION_FIELDS),
+# used for validating whole arrays at once (see Controllable_Variables.from_array).
+# They have to match the setters of Controllable_Variables.
+ACTION_MIN_VALUES = np.array([0, 0, 0, 0, 10, 0, 0, 0, 0, 0, 0, 0], dtype=np.float64)
+ACTION_MAX_VALUES = np.array([20, 20, 5000, 500, 100, 10, 2, 5000, 20, 20, 5000, 10000], dtype=np.float64)
+ACTION_STEPSIZES = np.array([1, 1, 100, 10, 2, 1, 1, 50, 1, 1, 100, 100], dtype=np.float64)
 
 """ Helper function to prevent values from becoming negative.
 
@@ -83,6 +135,89 @@ def step_and_clamp(value : int, min_val : int, max_val : int,
             result = (result // stepsize) * stepsize
         return result
 
+""" Vectorized version of step_and_clamp, applied element-wise to an array 
+    with one limit/stepsize per element. 
+    This is cheaper than calling step_and_clamp for every element
+    (e.g., when validating all controllable variables at once).
+
+    Parameters
+    ----------
+
+    values : np.ndarray
+        Any input numbers.
+    
+    min_values : np.ndarray
+        The minimum numbers allowed.
+
+    max_values : np.ndarray
+        The maximum numbers allowed.
+    
+    stepsizes : np.ndarray
+        The stepsizes to use.
+    
+    use_steps : bool
+        Indicates if the stepsizes should be considered.
+
+    Returns
+    -------
+    np.ndarray
+        Values within the ranges [min_values, max_values] that are multiples of the stepsizes.
+
+    """
+def step_and_clamp_array(values : np.ndarray, min_values : np.ndarray, max_values : np.ndarray,
+                         stepsizes : np.ndarray, use_steps : bool = True) -> np.ndarray:
+    # Same as np.clip, but with less overhead for small arrays
+    result = np.maximum(np.minimum(values, max_values), min_values)
+    if use_steps:
+        result = (result // stepsizes) * stepsizes
+    return result
+
+""" Helper function converting an array entry to int if it is integral.
+
+    Parameters
+    ----------
+
+    value : float
+        Any input number.
+
+    Returns
+    -------
+    {int, float}
+        The number as int if it is integral, otherwise as float.
+
+    """
+def _to_number(value : float) -> Union[int, float]:
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+""" Creates a property reading/writing one entry of the
+    state array of a Tailorshop_State.
+
+    Parameters
+    ----------
+
+    index : int
+        Position of the variable in the state array (see STATE_FIELDS).
+
+    convert : Callable
+        Conversion of the stored value when it is read (e.g., float) or None 
+        to return the entry of the array as it is.
+
+    Returns
+    -------
+    property
+        Property accessing the variable.
+
+    """
+def _state_property(index : int, convert : Callable = None) -> property:
+    def getter(self) -> float:
+        if convert is None:
+            return self._state[index]
+        return convert(self._state[index])
+    def setter(self, value : float) -> None:
+        self._state[index] = value
+    return property(getter, setter)
+
 class Tailorshop_State:
     """ Class for managing the state variables of the Tailorshop simulation.
     These consist of all variables not directly controllable by the user/player.
@@ -92,8 +227,41 @@ class Tailorshop_State:
     - damage (Percentage of damage to the machines)
     Note that, although counter-intuitive, most values are floats. This is because
     they can be non-integer in intermediate steps, but are rounded at the end.
+    The variables are stored contiguously in a float array (ordered as in STATE_FIELDS),
+    which is passed to the step kernel directly. The two additional variables are
+    derived from it on access, so they are always up to date.
 
     """
+    __slots__ = ("_state",)
+
+    # The rounded variables are returned as int (unless set to a non-integral value),
+    # the others as float
+    bank_account = _state_property(STATE_BANK_ACCOUNT, _to_number)
+    shirt_sales = _state_property(STATE_SHIRT_SALES, _to_number)
+    material_price = _state_property(STATE_MATERIAL_PRICE, _to_number)
+    shirt_stock = _state_property(STATE_SHIRT_STOCK, _to_number)
+    worker_satisfaction = _state_property(STATE_WORKER_SATISFACTION, float)
+    production_idle = _state_property(STATE_PRODUCTION_IDLE, float)
+    company_value = _state_property(STATE_COMPANY_VALUE, _to_number)
+    customer_interest = _state_property(STATE_CUSTOMER_INTEREST, _to_number)
+    material_stock = _state_property(STATE_MATERIAL_STOCK, _to_number)
+    machine_capacity = _state_property(STATE_MACHINE_CAPACITY, _to_number)
+
+    @property
+    def turn(self) -> int:
+        return int(self._state[STATE_TURN])
+
+    @turn.setter
+    def turn(self, value : int) -> None:
+        self._state[STATE_TURN] = value
+
+    @property
+    def damage(self) -> float:
+        return self.get_shown_damage()
+
+    @property
+    def percent_worker_satisfaction(self) -> int:
+        return self.get_shown_worker_satisfaction()
 
     """ Creates an instance of the Tailorshop state.
 
@@ -143,19 +311,21 @@ class Tailorshop_State:
                  company_value : float = 250691, customer_interest : float = 767, 
                  material_stock : float = 16, machine_capacity : float = 47, 
                  turn : int = 1) -> None:
-        self.bank_account = bank_account
-        self.shirt_sales = non_negative(shirt_sales)
-        self.material_price = non_negative(material_price)
-        self.shirt_stock = non_negative(shirt_stock)
-        self.worker_satisfaction = non_negative(worker_satisfaction)
-        self.production_idle = clamp(production_idle, 0, 100)
-        self.company_value = company_value
-        self.customer_interest = non_negative(customer_interest)
-        self.material_stock = non_negative(material_stock)
-        self.machine_capacity = clamp(machine_capacity, 0, 50)
-        self.turn = non_negative(turn)
-        self.damage = self.get_shown_damage()
-        self.percent_worker_satisfaction = self.get_shown_worker_satisfaction()
+        # Built in a single array (ordered as in STATE_FIELDS), with non_negative and 
+        # clamp inlined (same results, including the propagation of NaN)
+        self._state = np.array([
+            bank_account,
+            0 if shirt_sales < 0 else shirt_sales,
+            0 if material_price < 0 else material_price,
+            0 if shirt_stock < 0 else shirt_stock,
+            0 if worker_satisfaction < 0 else worker_satisfaction,
+            0 if production_idle < 0 else (100 if production_idle > 100 else production_idle),
+            company_value,
+            0 if customer_interest < 0 else customer_interest,
+            0 if material_stock < 0 else material_stock,
+            0 if machine_capacity < 0 else (50 if machine_capacity > 50 else machine_capacity),
+            0 if turn < 0 else turn
+        ], dtype=np.float64)
     
     """ Clones a given Tailorshop State.
 
@@ -187,6 +357,28 @@ class Tailorshop_State:
             turn=ts_state.turn
         )
     
+    """ Creates a state from a float array (ordered as in STATE_FIELDS) with a 
+    single copy of the array. Like update_from_array, the values are taken as 
+    they are, i.e., they are neither clamped nor rounded.
+
+    Parameters
+    ----------
+
+    values : np.ndarray
+        Array containing the state variables.
+
+    Returns
+    -------
+    Tailorshop_State
+        The state.
+
+    """
+    @staticmethod
+    def from_array(values : np.ndarray) -> Tailorshop_State:
+        ts_state = Tailorshop_State.__new__(Tailorshop_State)
+        ts_state._state = np.array(values, dtype=np.float64)
+        return ts_state
+
     """ Implementation of copy.
 
     Returns
@@ -197,22 +389,76 @@ class Tailorshop_State:
     """
     def __copy__(self) -> Tailorshop_State:
         return Tailorshop_State.from_ts_state(self)
+
+    """ Creates a copy by copying the variables directly, without
+    clamping them again (unlike copy, which uses the constructor).
+
+    Returns
+    -------
+    Tailorshop_State
+        Copy of the current state.
+
+    """
+    def clone(self) -> Tailorshop_State:
+        cloned = Tailorshop_State.__new__(Tailorshop_State)
+        cloned._state = self._state.copy()
+        return cloned
     
-    """ Rounds the variables and derives the values for 
-    damage and percent_worker_satisfaction.
+    """ Writes the state variables into a float array (ordered as in STATE_FIELDS).
+
+    Parameters
+    ----------
+
+    out : np.ndarray
+        Preallocated array of length len(STATE_FIELDS) or None.
+        When None is given, a new array is created.
+
+    Returns
+    -------
+    np.ndarray
+        Array containing the state variables.
+
+    """
+    def to_array(self, out : np.ndarray = None) -> np.ndarray:
+        if out is None:
+            return self._state.copy()
+        out[:] = self._state
+        return out
+
+    """ Sets the state variables from a float array (ordered as in STATE_FIELDS).
+    The values are taken as they are, i.e., they are neither clamped nor rounded.
+
+    Parameters
+    ----------
+
+    values : np.ndarray
+        Array containing the state variables.
+
+    """
+    def update_from_array(self, values : np.ndarray) -> None:
+        self._state[:] = values
+
+    """ Overwrites the variables of this state in-place with 
+    the ones of another state.
+
+    Parameters
+    ----------
+
+    ts_state : Tailorshop_State
+        State to copy the variables from.
+
+    """
+    def assign(self, ts_state : Tailorshop_State) -> None:
+        self._state[:] = ts_state._state
+
+    """ Rounds the variables (damage and percent_worker_satisfaction
+    are derived from the rounded values on access).
 
     """
     def round_and_update(self) -> None:
-        self.bank_account = round(self.bank_account)
-        self.shirt_sales = round(self.shirt_sales)
-        self.material_price = round(self.material_price)
-        self.shirt_stock = round(self.shirt_stock)
-        self.company_value = round(self.company_value)
-        self.customer_interest = round(self.customer_interest)
-        self.material_stock = round(self.material_stock)
-        self.machine_capacity = round(self.machine_capacity)
-        self.damage = self.get_shown_damage()
-        self.percent_worker_satisfaction = self.get_shown_worker_satisfaction()
+        # One vectorized rounding (half to even, like round) of all rounded variables.
+        # Adding 0.0 turns a negative zero into zero (as rounding to an int does)
+        self._state[STATE_ROUNDED_INDICES] = np.rint(self._state[STATE_ROUNDED_INDICES]) + 0.0
         # Worker satisfaction and production idle are primarily used to 
         #calculate damage and satisfaction (%), and should not be rounded before that
         # In the next turn, they are completely calculated from scratch, 
@@ -250,27 +496,223 @@ class Tailorshop_State:
 
     """
     def __str__(self) -> str:
-        text = "State \n"
-        text += "    Turn:                    {}\n".format(self.turn)
-        text += "    Bank Account:            {}\n".format(self.bank_account)
-        text += "    Company Value:           {}\n".format(self.company_value)
-        text += "    Shirt Sales:             {}\n".format(self.shirt_sales)
-        text += "    Shirt Stock:             {}\n".format(self.shirt_stock)
-        text += "    Material Price:          {}\n".format(self.material_price)
-        text += "    Material Stock:          {}\n".format(self.material_stock)
-        text += "    Customer Interest:       {}\n".format(self.customer_interest)
-        text += "    Production Idle:         {}\n".format(self.production_idle)
-        text += "    Machine Capacity:        {}\n".format(self.machine_capacity)
-        text += "    Machine Damage:          {}\n".format(self.damage)
-        text += "    Worker Satisfaction:     {}\n".format(self.worker_satisfaction)
-        text += "    Worker Satisfaction (%): {}\n".format(self.percent_worker_satisfaction)
-        return text
+        return (
+            "State \n"
+            f"    Turn:                    {self.turn}\n"
+            f"    Bank Account:            {self.bank_account}\n"
+            f"    Company Value:           {self.company_value}\n"
+            f"    Shirt Sales:             {self.shirt_sales}\n"
+            f"    Shirt Stock:             {self.shirt_stock}\n"
+            f"    Material Price:          {self.material_price}\n"
+            f"    Material Stock:          {self.material_stock}\n"
+            f"    Customer Interest:       {self.customer_interest}\n"
+            f"    Production Idle:         {self.production_idle}\n"
+            f"    Machine Capacity:        {self.machine_capacity}\n"
+            f"    Machine Damage:          {self.damage}\n"
+            f"    Worker Satisfaction:     {self.worker_satisfaction}\n"
+            f"    Worker Satisfaction (%): {self.percent_worker_satisfaction}\n"
+        )
+
+class Tailorshop_StateBatch:
+    """ Class for managing the state variables of many Tailorshop simulations at once
+    (e.g., for Monte-Carlo rollouts), vectorized version of Tailorshop_State.
+    The variables are stored field-wise (structure of arrays) in a float array of
+    shape (len(STATE_FIELDS), batch size), as used by Tailorshop.calculate_step_batch,
+    so every variable is an array with one entry per member of the batch.
+
+    """
+    __slots__ = ("_state",)
+
+    bank_account = _state_property(STATE_BANK_ACCOUNT)
+    shirt_sales = _state_property(STATE_SHIRT_SALES)
+    material_price = _state_property(STATE_MATERIAL_PRICE)
+    shirt_stock = _state_property(STATE_SHIRT_STOCK)
+    worker_satisfaction = _state_property(STATE_WORKER_SATISFACTION)
+    production_idle = _state_property(STATE_PRODUCTION_IDLE)
+    company_value = _state_property(STATE_COMPANY_VALUE)
+    customer_interest = _state_property(STATE_CUSTOMER_INTEREST)
+    material_stock = _state_property(STATE_MATERIAL_STOCK)
+    machine_capacity = _state_property(STATE_MACHINE_CAPACITY)
+    turn = _state_property(STATE_TURN)
+
+    @property
+    def damage(self) -> np.ndarray:
+        return self.get_shown_damage()
+
+    @property
+    def percent_worker_satisfaction(self) -> np.ndarray:
+        return self.get_shown_worker_satisfaction()
+
+    """ Creates a batch of states from a float array (see Tailorshop_State.from_array).
+    The values are taken as they are, i.e., they are neither clamped nor rounded.
+
+    Parameters
+    ----------
+
+    values : np.ndarray
+        Array containing the state variables, shape (len(STATE_FIELDS), batch size).
+
+    """
+    def __init__(self, values : np.ndarray) -> None:
+        self._state = np.array(values, dtype=np.float64)
+        if self._state.ndim != 2 or self._state.shape[0] != len(STATE_FIELDS):
+            raise ValueError("Expected states of shape ({}, n), got {}.".format(
+                len(STATE_FIELDS), self._state.shape))
+
+    """ Creates a batch from a list of states.
+
+    Parameters
+    ----------
+
+    ts_states : list
+        The states (Tailorshop_State) forming the batch.
+
+    Returns
+    -------
+    Tailorshop_StateBatch
+        The batch of states.
+
+    """
+    @staticmethod
+    def from_states(ts_states : list) -> Tailorshop_StateBatch:
+        values = np.empty((len(STATE_FIELDS), len(ts_states)), dtype=np.float64)
+        for idx, ts_state in enumerate(ts_states):
+            ts_state.to_array(out=values[:, idx])
+        return Tailorshop_StateBatch(values)
+
+    """ Returns a single member of the batch.
+
+    Parameters
+    ----------
+
+    idx : int
+        Position of the member in the batch.
+
+    Returns
+    -------
+    Tailorshop_State
+        The state of the member.
+
+    """
+    def get_state(self, idx : int) -> Tailorshop_State:
+        return Tailorshop_State.from_array(self._state[:, idx])
+
+    """ Returns the number of members of the batch.
+
+    Returns
+    -------
+    int
+        The batch size.
+
+    """
+    def __len__(self) -> int:
+        return self._state.shape[1]
+
+    """ Writes the state variables into a float array 
+    of shape (len(STATE_FIELDS), batch size).
+
+    Returns
+    -------
+    np.ndarray
+        Array containing the state variables.
+
+    """
+    def to_array(self) -> np.ndarray:
+        return self._state.copy()
+
+    """ Rounds the variables of all members (see Tailorshop_State.round_and_update).
+
+    """
+    def round_and_update(self) -> None:
+        self._state[STATE_ROUNDED_INDICES] = np.rint(self._state[STATE_ROUNDED_INDICES]) + 0.0
+
+    """ Returns the values for the damage based on machine capacity.
+
+    Returns
+    -------
+    np.ndarray
+        Interpretable machine damage per member.
+
+    """
+    def get_shown_damage(self) -> np.ndarray:
+        return 2 * (50 - self.machine_capacity)
+
+    """ Returns the percentages of worker satisfaction
+    (rounded half to even, like round).
+
+    Returns
+    -------
+    np.ndarray
+        Worker satisfaction in percent per member.
+
+    """
+    def get_shown_worker_satisfaction(self) -> np.ndarray:
+        return np.rint(100 * self.worker_satisfaction / 1.7) + 0.0
+
+""" Creates a property reading/writing one entry of the
+    actions array of Controllable_Variables.
+    The actions are integral (unless stepsizes are not considered), 
+    so integral values are returned as int.
+
+    Parameters
+    ----------
+
+    index : int
+        Position of the variable in the actions array (see ACTION_FIELDS).
+
+    Returns
+    -------
+    property
+        Property accessing the variable.
+
+    """
+def _action_property(index : int) -> property:
+    def getter(self) -> Union[int, float]:
+        return _to_number(self._actions[index])
+    def setter(self, value : Union[int, float]) -> None:
+        self._actions[index] = value
+    return property(getter, setter)
 
 class Controllable_Variables:
     """ Class for managing the controllable variables (actions).
     Provides setter-functions that consider the stepsizes and limits for the values.
+    The variables are stored contiguously in a float array (ordered as in ACTION_FIELDS),
+    which is passed to the step kernel directly.
 
     """
+    __slots__ = (
+        "use_steps", "_actions",
+        "worker_salary_offset", "worker_benefits_offset", "shirt_price_offset",
+        "material_order_offset", "machines_maintenance_offset", "advertising_offset"
+    )
+
+    # Names of the locations (indexed by location)
+    _location_names = ("Suburb", "City", "Inner City")
+    _location_indices = {name.lower(): idx for idx, name in enumerate(_location_names)}
+
+    # Variables that can only be changed in steps relative to their initial value,
+    # with the names of the attributes storing the offsets
+    _offsets = (
+        (ACTION_WORKERS_SALARY, "worker_salary_offset"),
+        (ACTION_WORKER_BENEFITS, "worker_benefits_offset"),
+        (ACTION_SHIRT_PRICE, "shirt_price_offset"),
+        (ACTION_MATERIAL_ORDER, "material_order_offset"),
+        (ACTION_MACHINES_MAINTENANCE, "machines_maintenance_offset"),
+        (ACTION_ADVERTISING, "advertising_offset")
+    )
+
+    workers50 = _action_property(ACTION_WORKERS50)
+    workers100 = _action_property(ACTION_WORKERS100)
+    workers_salary = _action_property(ACTION_WORKERS_SALARY)
+    worker_benefits = _action_property(ACTION_WORKER_BENEFITS)
+    shirt_price = _action_property(ACTION_SHIRT_PRICE)
+    outlets = _action_property(ACTION_OUTLETS)
+    location = _action_property(ACTION_LOCATION)
+    material_order = _action_property(ACTION_MATERIAL_ORDER)
+    machines50 = _action_property(ACTION_MACHINES50)
+    machines100 = _action_property(ACTION_MACHINES100)
+    machines_maintenance = _action_property(ACTION_MACHINES_MAINTENANCE)
+    advertising = _action_property(ACTION_ADVERTISING)
 
     """ Constructor for the Controllable Variable Object.
 
@@ -324,36 +766,36 @@ class Controllable_Variables:
                  machines100: int = 0, machines_maintenance: int = 1200, 
                  advertising: int = 2800, use_steps : bool = True) -> None:
         self.use_steps = use_steps
-        self.set_workers50(workers50)
-        self.set_workers100(workers100)
-        self.set_outlets(outlets)
-        self.set_location(location)
-        self.set_machines50(machines50)
-        self.set_machines100(machines100)
-        
-        w_salary_stepped = step_and_clamp(workers_salary, 0, 5000, 100, use_steps=self.use_steps)
-        self.worker_salary_offset = workers_salary - w_salary_stepped
-        self.set_workers_salary(workers_salary)
-
-        w_benefits_stepped = step_and_clamp(worker_benefits, 0, 500, 10, use_steps=self.use_steps)
-        self.worker_benefits_offset = worker_benefits - w_benefits_stepped
-        self.set_worker_benefits(worker_benefits)
-
-        shirt_price_stepped = step_and_clamp(shirt_price, 0, 100, 2, use_steps=self.use_steps)
-        self.shirt_price_offset = shirt_price - shirt_price_stepped
-        self.set_shirt_price(shirt_price)
-        
-        material_order_stepped = step_and_clamp(material_order, 0, 5000, 50, use_steps=self.use_steps)
-        self.material_order_offset = material_order - material_order_stepped
-        self.set_material_order(material_order)
-        
-        machines_maintenance_stepped = step_and_clamp(machines_maintenance, 0, 5000, 100, use_steps=self.use_steps)
-        self.machines_maintenance_offset = machines_maintenance - machines_maintenance_stepped
-        self.set_machines_maintenance(machines_maintenance)
-
-        advertising_stepped = step_and_clamp(advertising, 0, 10000, 100, use_steps=self.use_steps)
-        self.advertising_offset = advertising - advertising_stepped
-        self.set_advertising(advertising)
+        if not isinstance(location, int):
+            location = Controllable_Variables._location_index(location)
+        self._assign_array(np.array([
+            workers50, workers100, workers_salary, worker_benefits, shirt_price, outlets, 
+            location, material_order, machines50, machines100, machines_maintenance, advertising
+        ], dtype=np.float64))
+
+    """ Sets all variables from a float array (ordered as in ACTION_FIELDS) and
+    validates them at once (see step_and_clamp_array). 
+    Variables with an offset keep their value, and the difference to their stepped 
+    value becomes the offset. Note that the offsets are derived from values clamped
+    to a minimum of 0 (which only differs from the setter for the shirt price).
+
+    Parameters
+    ----------
+
+    values : np.ndarray
+        Array containing the controllable variables.
+
+    """
+    def _assign_array(self, values : np.ndarray) -> None:
+        stepped = step_and_clamp_array(values, ACTION_MIN_VALUES, ACTION_MAX_VALUES, 
+                                       ACTION_STEPSIZES, use_steps=self.use_steps)
+        stepped_for_offsets = step_and_clamp_array(values, 0, ACTION_MAX_VALUES, 
+                                                   ACTION_STEPSIZES, use_steps=self.use_steps)
+        offsets = values - stepped_for_offsets
+        for idx, offset_name in Controllable_Variables._offsets:
+            setattr(self, offset_name, _to_number(offsets[idx]))
+            stepped[idx] += offsets[idx]
+        self._actions = stepped
 
     """ Implementation of copy.
 
@@ -381,6 +823,83 @@ class Controllable_Variables:
         )
         return cloned
 
+    """ Creates a copy by copying all attributes (including the offsets)
+    directly, without passing the values through the setters again.
+    This is much cheaper than copy, which is used by the constructor.
+
+    Returns
+    -------
+    Controllable_Variables
+        Copy of the current object.
+
+    """
+    def clone(self) -> Controllable_Variables:
+        cloned = Controllable_Variables.__new__(Controllable_Variables)
+        for name in Controllable_Variables.__slots__:
+            setattr(cloned, name, getattr(self, name))
+        # The array must not be shared with the copy
+        cloned._actions = self._actions.copy()
+        return cloned
+
+    """ Creates controllable variables from a float array (ordered as in ACTION_FIELDS).
+
+    Parameters
+    ----------
+
+    values : np.ndarray
+        Array containing the controllable variables.
+
+    use_steps : bool
+        If true, stepsizes are considered. Otherwise, all values within
+        limits are allowed.
+
+    normalize : bool
+        If true, the values are truncated towards zero and then clamped to the limits 
+        and, if use_steps is true, rounded down to the stepsizes, as done by the 
+        constructor (which keeps the stepping remainder of some variables as an offset).
+        Otherwise, they are kept exactly as given (e.g., actions that were already 
+        applied by the step kernel), without truncating, clamping or stepping; 
+        only the offsets used by the setters are derived from the normalized values.
+
+    Returns
+    -------
+    Controllable_Variables
+        The controllable variables.
+
+    """
+    @staticmethod
+    def from_array(values : np.ndarray, use_steps : bool = True, 
+                   normalize : bool = True) -> Controllable_Variables:
+        # Truncate towards zero, then clamp/step like the constructor (see _assign_array)
+        values = np.asarray(values, dtype=np.float64)
+        actions = Controllable_Variables.__new__(Controllable_Variables)
+        actions.use_steps = use_steps
+        actions._assign_array(np.trunc(values) + 0.0)
+        if not normalize:
+            actions._actions = values.copy()
+        return actions
+
+    """ Writes the controllable variables into a float array (ordered as in ACTION_FIELDS).
+
+    Parameters
+    ----------
+
+    out : np.ndarray
+        Preallocated array of length len(ACTION_FIELDS) or None.
+        When None is given, a new array is created.
+
+    Returns
+    -------
+    np.ndarray
+        Array containing the controllable variables.
+
+    """
+    def to_array(self, out : np.ndarray = None) -> np.ndarray:
+        if out is None:
+            return self._actions.copy()
+        out[:] = self._actions
+        return out
+
     """ Returns a readable string representation of the actions.
 
     Returns
@@ -390,20 +909,21 @@ class Controllable_Variables:
 
     """
     def __str__(self) -> str:
-        text = "Actions\n"
-        text += "    Workers 50:              {}\n".format(self.workers50)
-        text += "    Workers 100:             {}\n".format(self.workers100)
-        text += "    Worker Salary:           {}\n".format(self.workers_salary)
-        text += "    Worker Benefits:         {}\n".format(self.worker_benefits)
-        text += "    Shirt Price:             {}\n".format(self.shirt_price)
-        text += "    Number of outlets:       {}\n".format(self.outlets)
-        text += "    Location:                {}\n".format(["Suburb", "City", "Inner City"][self.location])
-        text += "    Material Order:          {}\n".format(self.material_order)
-        text += "    Machines 50:             {}\n".format(self.machines50)
-        text += "    Machines 100:            {}\n".format(self.machines100)
-        text += "    Machine Maintenance:     {}\n".format(self.machines_maintenance)
-        text += "    Advertising:             {}\n".format(self.advertising)
-        return text
+        return (
+            "Actions\n"
+            f"    Workers 50:              {self.workers50}\n"
+            f"    Workers 100:             {self.workers100}\n"
+            f"    Worker Salary:           {self.workers_salary}\n"
+            f"    Worker Benefits:         {self.worker_benefits}\n"
+            f"    Shirt Price:             {self.shirt_price}\n"
+            f"    Number of outlets:       {self.outlets}\n"
+            f"    Location:                {Controllable_Variables._location_names[self.location]}\n"
+            f"    Material Order:          {self.material_order}\n"
+            f"    Machines 50:             {self.machines50}\n"
+            f"    Machines 100:            {self.machines100}\n"
+            f"    Machine Maintenance:     {self.machines_maintenance}\n"
+            f"    Advertising:             {self.advertising}\n"
+        )
 
     """ Changes the number of workers50.
     The new value will be clamped to ensure it is within the limits.
@@ -489,6 +1009,27 @@ class Controllable_Variables:
     def set_outlets(self, value : int):
         self.outlets = step_and_clamp(value, 0, 10, 1, use_steps=self.use_steps)
 
+    """ Looks up the index of a location by its name (case-insensitive).
+
+    Parameters
+    ----------
+
+    location : str
+        One of ["Suburb", "City", "Inner City"].
+
+    Returns
+    -------
+    int
+        Index of the location.
+
+    """
+    @staticmethod
+    def _location_index(location : str) -> int:
+        idx = Controllable_Variables._location_indices.get(location.lower())
+        if idx is None:
+            raise ValueError("Unknown location '{}'.".format(location))
+        return idx
+
     """ Changes the location.
     The new value will be clamped to ensure it is within the limits.
 
@@ -505,7 +1046,7 @@ class Controllable_Variables:
         if isinstance(location, int):
             self.location = step_and_clamp(location, 0, 2, 1, use_steps=self.use_steps)
         else:
-            idx = ["suburb", "city", "inner city"].index(location.lower())
+            idx = Controllable_Variables._location_index(location)
             self.location = step_and_clamp(idx, 0, 2, 1, use_steps=self.use_steps)
 
     """ Changes the amount of raw material to order.